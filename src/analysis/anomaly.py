@@ -0,0 +1,199 @@
+import json
+import math
+import os
+
+import pandas as pd
+
+ALL_PLATFORMS = 'all'
+
+
+class EwmaZScore:
+    """
+    Exponentially weighted mean / variance of one series with O(1) state.
+    Each new value is scored against the state *before* it is folded in.
+    """
+
+    def __init__(self, alpha=0.1, mean=None, var=0.0, n=0):
+        self.alpha = alpha
+        self.mean = mean
+        self.var = var
+        self.n = n
+
+    def update(self, x):
+        """Fold in `x`; returns its z-score against the prior state (None while empty)."""
+        if self.mean is None:
+            self.mean, self.n = x, 1
+            return None
+        sd = math.sqrt(self.var)
+        z = (x - self.mean) / sd if sd > 1e-9 else 0.0
+        diff = x - self.mean
+        incr = self.alpha * diff
+        self.mean += incr
+        self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.n += 1
+        return z
+
+    def state(self):
+        return {'mean': self.mean, 'var': self.var, 'n': self.n}
+
+
+class AnomalyMonitor:
+    """
+    Online sentiment anomaly detector. Rows are bucketed per platform (and for
+    all platforms combined) by `freq` ('D' daily, 'h' hourly); when a bucket
+    closes, its mean sentiment is scored against that series' EWMA and an
+    event is emitted if |z| >= threshold after `warmup` buckets.
+
+    Rows need not arrive in time order: the newest `reorder` buckets before
+    the latest one stay open, and a bucket closes (in time order) only once
+    a row more than `reorder` buckets newer arrives. Rows for a bucket that
+    has already closed are counted in `late_rows` and not re-scored. State
+    per series is O(reorder): the EWMA plus each open bucket's count and sum.
+
+    Library use:
+        monitor = AnomalyMonitor(freq='D')
+        events = monitor.observe(chunk_df)   # any number of times
+        events += monitor.flush()            # close the open buckets
+    """
+
+    def __init__(self, freq='D', alpha=0.1, threshold=3.0, warmup=7, min_count=3, reorder=2):
+        self.freq = freq
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_count = min_count   # buckets with fewer rows are too noisy to score
+        self.reorder = reorder       # buckets kept open behind the newest one
+        self.series = {}             # platform → EwmaZScore
+        self.open = {}               # platform → {bucket start: [count, sum]}
+        self.closed = {}             # platform → last closed bucket start
+        self.late_rows = 0
+        self.events = []
+
+    # ── streaming ────────────────────────────────────────────────────────────
+    def observe(self, df):
+        """Feed processed rows (timestamp, platform, analyzed_sentiment); returns new events."""
+        if df.empty:
+            return []
+        ts = df['timestamp']
+        if not pd.api.types.is_datetime64_any_dtype(ts):
+            ts = pd.to_datetime(ts)
+        frame = pd.DataFrame({'bucket': ts.dt.floor(self.freq).values,
+                              'platform': df['platform'].astype(str).values,
+                              'score': df['analyzed_sentiment'].astype(float).values})
+        # groupby sorts by bucket, so each chunk is folded in time order
+        per_platform = frame.groupby(['bucket', 'platform'])['score'].agg(['count', 'sum'])
+        combined = frame.groupby('bucket')['score'].agg(['count', 'sum'])
+        return self._add_groups(per_platform, combined)
+
+    def _add_groups(self, per_platform, combined):
+        events = []
+        for (bucket, platform), row in per_platform.iterrows():
+            events += self._add(platform, bucket, row['count'], row['sum'])
+        for bucket, row in combined.iterrows():
+            events += self._add(ALL_PLATFORMS, bucket, row['count'], row['sum'])
+        return events
+
+    def _horizon(self, newest):
+        """Buckets older than this are closed once `newest` is open."""
+        return newest - self.reorder * pd.tseries.frequencies.to_offset(self.freq)
+
+    def _add(self, platform, bucket, count, total):
+        bucket = pd.Timestamp(bucket)
+        buckets = self.open.setdefault(platform, {})
+        closed = self.closed.get(platform)
+        if (closed is not None and bucket <= closed) or (buckets and bucket < self._horizon(max(buckets))):
+            self.late_rows += int(count)   # bucket already closed — not re-scored
+            return []
+        current = buckets.setdefault(bucket, [0, 0.0])
+        current[0] += int(count)
+        current[1] += float(total)
+        horizon = self._horizon(max(buckets))
+        events = []
+        for start in sorted(b for b in buckets if b < horizon):
+            events += self._close(platform, start)
+        return events
+
+    def _close(self, platform, bucket):
+        count, total = self.open[platform].pop(bucket)
+        self.closed[platform] = bucket
+        if count < self.min_count:
+            return []
+        value = total / count
+        series = self.series.setdefault(platform, EwmaZScore(self.alpha))
+        expected = series.mean
+        z = series.update(value)
+        if z is None or series.n <= self.warmup or abs(z) < self.threshold:
+            return []
+        event = {
+            'platform': platform,
+            'bucket': pd.Timestamp(bucket),
+            'value': round(value, 4),
+            'expected': round(expected, 4),
+            'zscore': round(z, 2),
+            'count': count,
+            'direction': 'spike' if z > 0 else 'drop',
+        }
+        self.events.append(event)
+        return [event]
+
+    def flush(self):
+        """Close every open bucket (end of stream / end of a campaign window)."""
+        events = []
+        for platform, buckets in self.open.items():
+            for bucket in sorted(buckets):
+                events += self._close(platform, bucket)
+        return events
+
+    def observe_rollup(self, rollup):
+        """
+        Feed a SentimentRollup's aggregates in time order, leaving the newest
+        buckets open like observe() does — e.g. after a rebuild, whose chunks
+        are in file order rather than time order.
+        """
+        table = rollup.table
+        if table.empty:
+            return []
+        ts = pd.to_datetime(table['date']) + pd.to_timedelta(table['hour'], unit='h')
+        frame = pd.DataFrame({'bucket': ts.dt.floor(self.freq), 'platform': table['platform'],
+                              'count': table['count'], 'sum': table['sum']})
+        per_platform = frame.groupby(['bucket', 'platform'])[['count', 'sum']].sum()
+        combined = frame.groupby('bucket')[['count', 'sum']].sum()
+        return self._add_groups(per_platform, combined)
+
+    def replay_rollup(self, rollup):
+        """Run the detector over a SentimentRollup's aggregates in time order."""
+        return self.observe_rollup(rollup) + self.flush()
+
+    # ── persistence (between incremental runs) ───────────────────────────────
+    def save(self, path):
+        state = {
+            'params': {'freq': self.freq, 'alpha': self.alpha, 'threshold': self.threshold,
+                       'warmup': self.warmup, 'min_count': self.min_count, 'reorder': self.reorder},
+            'series': {p: s.state() for p, s in self.series.items()},
+            'open': {p: [[str(b), c, t] for b, (c, t) in sorted(buckets.items())]
+                     for p, buckets in self.open.items()},
+            'closed': {p: str(b) for p, b in self.closed.items()},
+            'late_rows': self.late_rows,
+        }
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, **params):
+        """Restore a saved monitor, or build a fresh one from `params` if none exists."""
+        if not os.path.exists(path):
+            return cls(**params)
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        monitor = cls(**state['params'])
+        monitor.series = {p: EwmaZScore(monitor.alpha, **s) for p, s in state['series'].items()}
+        monitor.open = {}
+        for p, buckets in state['open'].items():
+            if buckets and not isinstance(buckets[0], list):
+                buckets = [buckets]   # state saved before the reorder window: one open bucket
+            monitor.open[p] = {pd.Timestamp(b): [c, t] for b, c, t in buckets}
+        monitor.closed = {p: pd.Timestamp(b) for p, b in state.get('closed', {}).items()}
+        monitor.late_rows = state['late_rows']
+        return monitor
@@ -0,0 +1,108 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from analysis.tokenizer import content_hash
+
+URL_PATTERN = r'https?://\S+'
+RETWEET_PATTERN = r'^rt @\w+:\s*'
+MENTION_PATTERN = r'@\w+'
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize(texts):
+    """Lowercased text without retweet prefix, URLs, @mentions, '#' or repeated whitespace."""
+    s = pd.Series(texts, dtype=object).fillna('').astype(str).str.lower()
+    s = s.str.replace(RETWEET_PATTERN, '', regex=True)
+    s = s.str.replace(URL_PATTERN, ' ', regex=True).str.replace(MENTION_PATTERN, ' ', regex=True)
+    s = s.str.replace('#', '', regex=False).str.replace(r'\s+', ' ', regex=True).str.strip()
+    return s
+
+
+def shingles(text, k):
+    """Character k-grams: works for Cantonese / Chinese posts, which have no spaces."""
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+class Deduplicator:
+    """
+    Groups posts into clusters of exact and near-duplicates so each cluster is
+    scored and tokenized once. Exact duplicates (after normalize) share a
+    content hash; each new distinct text gets a MinHash signature over its
+    character shingles, and LSH banding finds earlier clusters whose
+    estimated Jaccard similarity is at least `threshold`.
+
+    Clusters persist across calls (chunks of one run), so a retweet in a later
+    chunk joins the cluster of the original. A cluster id is the hash of its
+    first member's normalized text.
+    """
+
+    def __init__(self, threshold=0.7, num_perm=64, bands=16, shingle_size=4, seed=4150,
+                 max_clusters=500_000):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_clusters = max_clusters
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.reset()
+
+    def reset(self):
+        self._exact = {}          # normalized-text hash → cluster id
+        self._buckets = {}        # (band, band signature) → cluster ids
+        self._signatures = {}     # cluster id → MinHash signature
+        self.representatives = {}  # cluster id → first member's original text
+
+    def signature(self, text):
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles(text, self.shingle_size)),
+                             dtype=np.uint64)
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, sig):
+        return [(b, sig[b * self.rows:(b + 1) * self.rows].tobytes()) for b in range(self.bands)]
+
+    def _match(self, sig, keys):
+        candidates = {c for key in keys for c in self._buckets.get(key, ())}
+        best, best_sim = None, self.threshold
+        for c in candidates:
+            sim = float(np.mean(self._signatures[c] == sig))
+            if sim >= best_sim:
+                best, best_sim = c, sim
+        return best
+
+    def assign(self, texts):
+        """Cluster id per text (array aligned with `texts`)."""
+        texts = pd.Series(texts, dtype=object).fillna('').astype(str).reset_index(drop=True)
+        codes, uniques = pd.factorize(normalize(texts))
+        first = np.unique(codes, return_index=True)[1]   # first row of each distinct text
+        if len(self._exact) > self.max_clusters:
+            self.reset()   # bound memory on an unbounded feed
+
+        ids = []
+        for code, norm in enumerate(uniques):
+            key = content_hash(norm)
+            cluster = self._exact.get(key)
+            if cluster is None:
+                sig = self.signature(norm)
+                keys = self._band_keys(sig)
+                cluster = self._match(sig, keys)
+                if cluster is None:
+                    cluster = key.hex()
+                    self._signatures[cluster] = sig
+                    self.representatives[cluster] = texts.iat[first[code]]
+                    for k in keys:
+                        self._buckets.setdefault(k, []).append(cluster)
+                self._exact[key] = cluster
+            ids.append(cluster)
+        return np.asarray(ids, dtype=object)[codes]
+
+    def representative_texts(self, cluster_ids):
+        """The text each cluster is scored and tokenized by."""
+        return [self.representatives[c] for c in cluster_ids]
@@ -1,36 +1,348 @@
 import pandas as pd
-import jieba
+import io
 import os
-import time
+from collections import Counter
+
+from analysis.sentiment import SentimentEngine
+from analysis.incremental import ProcessedIndex
+from analysis.storage import open_store
+from analysis.rollup import SentimentRollup
+from analysis.tokenizer import Tokenizer
+from analysis.dedup import Deduplicator
+from analysis.term_frequency import TermFrequency
+
+CHUNK_SIZE = 50_000   # rows per chunk in streaming mode
+SCORED_COLUMNS = ['language', 'analyzed_sentiment']
+
+
+def _complete_rows_end(path):
+    """File size trimmed back to the last newline, so a half-written row is left for next run."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+    cut = tail.rfind(b'\n')
+    return size if cut < 0 else size - len(tail) + cut + 1
+
+
+class _BoundedReader(io.RawIOBase):
+    """Read-only view of an open binary file that stops at byte `end`."""
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), max(0, self._end - self._f.tell()))
+        if not n:
+            return 0
+        data = self._f.read(n)
+        buffer[:len(data)] = data
+        return len(data)
+
 
 class DataProcessor:
-    def __init__(self, raw_path, processed_path):
+    def __init__(self, raw_path, processed_path, workers=None, stopwords=None, storage=None,
+                 dedup=True):
         self.raw_path = raw_path
         self.processed_path = processed_path
+        self.engine = SentimentEngine(workers=workers)
+        self.tokenizer = Tokenizer(stopwords=stopwords, workers=workers)
+        # exact + near-duplicate (MinHash/LSH) clusters are scored and tokenized once
+        self.dedup = Deduplicator() if dedup else None
         if not os.path.exists(self.processed_path):
             os.makedirs(self.processed_path)
+        # 'parquet' (date-partitioned, typed) when pyarrow is available, else 'csv'
+        self.store = open_store(self.processed_path, storage)
+        self.rollup = SentimentRollup(self.processed_path)
+        self.terms = TermFrequency(self.processed_path)   # corpus term counts for the word cloud
+        self._index = None   # ProcessedIndex shared by incremental runs and live ingest
 
     def process_sentiment(self):
         print(f"Reading raw data from {self.raw_path}...")
         df = pd.read_csv(self.raw_path)
         
-        print("Initializing NLP pipeline (Jieba + TextBlob)...")
-        time.sleep(1)
-        
-        # Use the simulated column
-        df['analyzed_sentiment'] = df['simulated_sentiment'] 
+        print("Scoring sentiment (TextBlob EN / SnowNLP ZH)...")
+        df = next(self._score_chunks([df]))
+        if self.dedup is not None:
+            print(f"  {df['cluster_id'].nunique():,} distinct post cluster(s) in {len(df):,} rows")
         
-        all_text = " ".join(df['content'].tolist())
-        words = jieba.lcut(all_text)
-        filtered_words = [w for w in words if len(w) > 1 and w not in ['HashKey', 'the', 'and', 'for']]
+        filtered_words = [w for tokens in self.tokenizer.tokenize(self._distinct_texts(df, set()))
+                          for w in tokens]
         
-        processed_file = os.path.join(self.processed_path, "sentiment_results.csv")
-        df.to_csv(processed_file, index=False)
-        print(f"Processed data saved to {processed_file}")
+        self.store.write(df)
+        self._reset_index()   # full rewrite invalidates the watermark
+        self.rollup.reset()
+        self.rollup.update(df)
+        self.rollup.save()
+        self.terms.reset()
+        self.terms.update(*self._weighted_tokens(df))
+        self.terms.save()
+        print(f"Processed data saved to {self.store.path}")
         return df, filtered_words
 
+    # ── Streaming mode: read → score → tokenize → write, one chunk at a time ──
+    def _read_chunks(self, chunksize, offset=None, end=None):
+        """
+        Raw rows in chunks; from byte `offset` (header re-used) and never past
+        byte `end` when given, so a half-written trailing row is left unread.
+        """
+        if offset is None and end is None:
+            yield from pd.read_csv(self.raw_path, chunksize=chunksize, dtype={'id': str})
+            return
+        columns = pd.read_csv(self.raw_path, nrows=0).columns if offset is not None else None
+        with open(self.raw_path, 'rb') as f:
+            if offset is not None:
+                f.seek(offset)
+            end = os.path.getsize(self.raw_path) if end is None else end
+            if f.tell() >= end:
+                return
+            reader = io.BufferedReader(_BoundedReader(f, end))
+            if columns is None:
+                chunks = pd.read_csv(reader, chunksize=chunksize, dtype={'id': str})
+            else:
+                chunks = pd.read_csv(reader, header=None, names=columns, chunksize=chunksize,
+                                     dtype={'id': str})
+            yield from chunks
+
+    def _score_chunks(self, chunks):
+        for chunk in chunks:
+            texts = chunk['content']
+            if self.dedup is not None:
+                # every member of a cluster takes its representative's score
+                chunk['cluster_id'] = self.dedup.assign(texts)
+                texts = self.dedup.representative_texts(chunk['cluster_id'])
+            chunk['language'] = self.engine.languages(texts)
+            chunk['analyzed_sentiment'] = self.engine.score(texts)
+            yield chunk
+
+    def _distinct_texts(self, chunk, counted):
+        """Texts to count terms from: one per cluster not yet in `counted` (all rows without dedup)."""
+        if 'cluster_id' not in chunk:
+            return chunk['content']
+        clusters = chunk['cluster_id'].drop_duplicates()
+        clusters = clusters[~clusters.isin(counted)]
+        counted.update(clusters)
+        return self.dedup.representative_texts(clusters)
+
+    def _tokenize_chunks(self, chunks, keyword_counts):
+        counted = set()   # clusters whose terms are already in keyword_counts
+        for chunk in chunks:
+            token_lists = self.tokenizer.tokenize(self._distinct_texts(chunk, counted))
+            keyword_counts.update(Tokenizer.term_counts(token_lists))
+            self.terms.update(*self._weighted_tokens(chunk))
+            yield chunk
+
+    def _weighted_tokens(self, chunk, representatives=None):
+        """(token lists, post counts): one entry per cluster (or distinct text) in `chunk`."""
+        if 'cluster_id' in chunk:
+            sizes = chunk['cluster_id'].value_counts(sort=False)
+            texts = (self.dedup.representative_texts(sizes.index) if representatives is None
+                     else representatives.loc[sizes.index].tolist())
+        else:
+            sizes = chunk['content'].fillna('').astype(str).value_counts(sort=False)
+            texts = sizes.index.tolist()
+        # the tokenizer caches by content hash, so clusters seen earlier are not re-segmented
+        return self.tokenizer.tokenize(texts), sizes.values
+
+    def rebuild_terms(self):
+        """Recompute the corpus term counts from the results store."""
+        columns = ['content'] + (['cluster_id'] if 'cluster_id' in self.store.columns() else [])
+        df = self.store.read(columns=columns)
+        representatives = None
+        if 'cluster_id' in df:
+            representatives = df.drop_duplicates('cluster_id').set_index('cluster_id')['content']
+        self.terms.reset()
+        self.terms.update(*self._weighted_tokens(df, representatives))
+        self.terms.save()
+
+    def _reset_index(self):
+        ProcessedIndex(self.processed_path).reset()
+        self._index = None
+
+    @classmethod
+    def _watch(cls, monitor, chunk):
+        """Feed a scored chunk to an AnomalyMonitor and report what it flags."""
+        if monitor is not None:
+            cls._report(monitor.observe(chunk))
+
+    @staticmethod
+    def _report(events):
+        for event in events:
+            print(f"  ANOMALY {event['platform']} {event['bucket']}: mean {event['value']:+.3f} "
+                  f"vs {event['expected']:+.3f} expected (z={event['zscore']:+.2f}, "
+                  f"{event['count']} posts)")
+
+    def process_sentiment_streaming(self, chunksize=CHUNK_SIZE, monitor=None):
+        """
+        Same output as process_sentiment, but the feed is processed in chunks of
+        `chunksize` rows and appended to the results store as it goes, so
+        peak memory is bounded by the chunk size rather than the archive size.
+        Pass an AnomalyMonitor as `monitor` to flag sentiment anomalies; it is
+        fed from the finished rollup, since the archive's chunks are in file
+        order rather than time order. Like an incremental run, it stops at the last complete
+        row and records the processed ids and watermark, so the next
+        incremental run resumes where this one ended.
+        Returns (rows processed, Counter of keyword frequencies).
+        """
+        print(f"Streaming raw data from {self.raw_path} ({chunksize:,} rows/chunk)...")
+        keyword_counts = Counter()
+        rows, max_ts = 0, None
+        self.store.reset()
+        self.rollup.reset()
+        self.terms.reset()
+        self._reset_index()
+        index = self._index = ProcessedIndex(self.processed_path)
+
+        end = _complete_rows_end(self.raw_path)
+        pipeline = self._tokenize_chunks(
+            self._score_chunks(self._read_chunks(chunksize, end=end)), keyword_counts)
+        for i, chunk in enumerate(pipeline):
+            self.store.write(chunk, append=True)
+            self.rollup.update(chunk)
+            index.add(chunk['id'])
+            rows += len(chunk)
+            chunk_max = str(chunk['timestamp'].max())
+            max_ts = chunk_max if max_ts is None else max(max_ts, chunk_max)
+            print(f"  chunk {i + 1}: {rows:,} rows written")
+        self.rollup.save()
+        self.terms.save()
+        index.commit(self.raw_path, end, max_ts, rows)
+        if monitor is not None:
+            self._report(monitor.observe_rollup(self.rollup))
+
+        print(f"Processed data saved to {self.store.path}")
+        return rows, keyword_counts
+
+    # ── Incremental mode: only rows not yet in the processed-ID index ──────────
+    def process_incremental(self, backfill=None, chunksize=CHUNK_SIZE, monitor=None):
+        """
+        Score and append only rows whose `id` has not been processed yet. An
+        archive that has only grown is read from the stored byte watermark, so a
+        daily run costs O(new rows). `backfill=(start, end)` re-scores every row
+        with a timestamp in that window, replacing its previous result. New rows
+        are fed to `monitor` (an AnomalyMonitor), if given, as they are scored.
+        Returns (rows appended, Counter of keyword frequencies for those rows).
+        """
+        store = self.store
+        index = self._index = ProcessedIndex(self.processed_path)
+        scored = set(SCORED_COLUMNS) | ({'cluster_id'} if self.dedup is not None else set())
+        legacy_csv = os.path.join(self.processed_path, "sentiment_results.csv")
+        if store.fmt == 'parquet' and not store.exists() and os.path.exists(legacy_csv) \
+                and scored <= set(pd.read_csv(legacy_csv, nrows=0).columns):
+            print(f"Importing existing results from {legacy_csv} into {store.path}")
+            store.import_csv(legacy_csv, chunksize)
+        if store.exists() and not scored <= set(store.columns()):
+            store.reset()   # written by an older scoring pipeline — redo it
+        if not store.exists():
+            index.reset()
+            self.rollup.reset()
+            self.terms.reset()
+        elif not index.ids:
+            # results written by a full run — adopt its ids instead of duplicating them
+            index.add(store.read(columns=['id'])['id'])
+        if store.exists() and not self.rollup.exists():
+            self.rollup.rebuild(store)
+        if store.exists() and not self.terms.exists():
+            self.rebuild_terms()
+
+        end = _complete_rows_end(self.raw_path)
+        window = None
+        if backfill:
+            window = (pd.Timestamp(backfill[0]), pd.Timestamp(backfill[1]))
+            dropped = store.drop_window(*window, chunksize) if store.exists() else 0
+            print(f"Backfill {window[0]} → {window[1]}: {dropped:,} row(s) will be re-scored")
+            offset = None   # window rows can sit anywhere in the archive
+        else:
+            offset = index.resume_offset(self.raw_path)
+        print(f"Incremental run from {self.raw_path} "
+              f"({'byte ' + format(offset, ',') if offset else 'full scan'}, "
+              f"{len(index.ids):,} id(s) indexed, watermark {index.watermark})")
+
+        def _new_rows(chunks):
+            for chunk in chunks:
+                keep = ~chunk['id'].isin(index.ids)
+                if window:
+                    ts = pd.to_datetime(chunk['timestamp'])
+                    keep |= (ts >= window[0]) & (ts <= window[1])
+                chunk = chunk[keep]
+                if len(chunk):
+                    yield chunk.copy()
+
+        keyword_counts = Counter()
+        rows, backfilled, max_ts = 0, 0, None
+        pipeline = self._tokenize_chunks(
+            self._score_chunks(_new_rows(self._read_chunks(chunksize, offset, end))),
+            keyword_counts)
+        for chunk in pipeline:
+            # backfilled rows are re-scored but already indexed (and already seen by the monitor)
+            fresh = ~chunk['id'].astype(str).isin(index.ids)
+            store.write(chunk, append=True)
+            self.rollup.update(chunk)
+            self.rollup.save()
+            self.terms.save()
+            index.add(chunk.loc[fresh, 'id'])
+            self._watch(monitor, chunk[fresh])
+            rows += int(fresh.sum())
+            backfilled += int((~fresh).sum())
+            chunk_max = str(chunk['timestamp'].max())
+            max_ts = chunk_max if max_ts is None else max(max_ts, chunk_max)
+            print(f"  {rows:,} new row(s) appended" + (f", {backfilled:,} re-scored" if window else ""))
+
+        if window:
+            self.rollup.rebuild(store)   # dropped rows must leave the aggregates too
+            self.rebuild_terms()
+        index.commit(self.raw_path, end, max_ts, rows)
+        print(f"Incremental run complete: {rows:,} row(s) appended to {store.path}"
+              + (f", {backfilled:,} backfilled row(s) re-scored" if window else ""))
+        return rows, keyword_counts
+
+    def unprocessed(self, df):
+        """Rows of `df` whose id has not been processed yet (first occurrence of each)."""
+        if self._index is None:
+            self._index = ProcessedIndex(self.processed_path)
+        return df[~df['id'].astype(str).isin(self._index.ids)].drop_duplicates('id')
+
+    def ingest(self, df, monitor=None):
+        """
+        Score and append rows pushed by a live collector (raw feed columns: id,
+        timestamp, platform, user, content). Rows whose id is already indexed
+        are dropped, so the same posts later read from the archive are skipped.
+        Returns (rows appended, Counter of keyword frequencies for those rows).
+        """
+        keyword_counts = Counter()
+        df = self.unprocessed(df)
+        if df.empty:
+            return 0, keyword_counts
+        chunk = next(self._tokenize_chunks(self._score_chunks([df.copy()]), keyword_counts))
+        self.store.write(chunk, append=True)
+        self.rollup.update(chunk)
+        self.rollup.save()
+        self.terms.save()
+        self._index.add(chunk['id'])
+        self._watch(monitor, chunk)
+        return len(chunk), keyword_counts
+
+    def load_results(self, columns=None):
+        """Processed results, typed; pass `columns` to read only what a chart needs."""
+        return self.store.read(columns=columns)
+
+    def close(self):
+        """Shut down the scoring and tokenizing worker pools."""
+        self.engine.close()
+        self.tokenizer.close()
+
+    def export_csv(self, path=None):
+        path = path or os.path.join(self.processed_path, "sentiment_results.csv")
+        self.store.export_csv(path)
+        print(f"Processed data exported to {path}")
+        return path
+
 if __name__ == "__main__":
-    # Test block
+    # Test block (from src/: python -m analysis.processor)
     base = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     raw = os.path.join(base, "data", "raw", "social_feed_archived.csv")
     proc = os.path.join(base, "data", "processed")
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+KEYS = ['date', 'hour', 'platform']
+STATS = ['count', 'sum', 'sumsq']
+DTYPES = {'date': str, 'hour': int, 'platform': str, 'count': int, 'sum': float, 'sumsq': float}
+
+
+def _empty():
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in DTYPES.items()})
+
+
+class SentimentRollup:
+    """
+    Pre-aggregated analyzed_sentiment per (date, hour, platform): count, sum and
+    sum of squares. Aggregates are additive, so new rows are folded in chunk by
+    chunk and any coarser view (daily, per platform) plus its mean and variance
+    is derived from a few KB instead of rescanning the processed rows.
+
+    Stored as sentiment_rollup.csv next to the processed results.
+    """
+
+    def __init__(self, processed_path):
+        self.path = os.path.join(processed_path, "sentiment_rollup.csv")
+        if os.path.exists(self.path):
+            self.table = pd.read_csv(self.path, dtype=DTYPES)
+        else:
+            self.table = _empty()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @staticmethod
+    def aggregate(df):
+        """(date, hour, platform) → count / sum / sumsq for a frame of processed rows."""
+        ts = df['timestamp']
+        if not pd.api.types.is_datetime64_any_dtype(ts):
+            ts = pd.to_datetime(ts)
+        score = df['analyzed_sentiment'].astype(float)
+        parts = pd.DataFrame({
+            'date': ts.dt.strftime('%Y-%m-%d').values,
+            'hour': ts.dt.hour.values,
+            'platform': df['platform'].astype(str).values,
+            'count': 1,
+            'sum': score.values,
+            'sumsq': np.square(score.values),
+        })
+        return parts.groupby(KEYS, as_index=False)[STATS].sum()
+
+    def update(self, df):
+        """Fold a chunk of newly processed rows into the aggregates."""
+        if df.empty:
+            return
+        parts = [t for t in (self.table, self.aggregate(df)) if not t.empty]
+        combined = pd.concat(parts, ignore_index=True).astype(DTYPES)
+        self.table = combined.groupby(KEYS, as_index=False)[STATS].sum()
+
+    def rebuild(self, store):
+        """Recompute from the results store, reading only the three columns needed."""
+        self.reset()
+        self.update(store.read(columns=['timestamp', 'platform', 'analyzed_sentiment']))
+        self.save()
+
+    def reset(self):
+        self.table = _empty()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        self.table.sort_values(KEYS).to_csv(tmp, index=False)
+        os.replace(tmp, self.path)
+
+    # ── queries ──────────────────────────────────────────────────────────────
+    def summary(self, by=('date',), platform=None):
+        """count / mean / variance grouped by any subset of (date, hour, platform)."""
+        table = self.table
+        if platform is not None:
+            table = table[table['platform'] == platform]
+        g = table.groupby(list(by), as_index=False)[STATS].sum()
+        g['mean'] = g['sum'] / g['count']
+        g['variance'] = (g['sumsq'] / g['count'] - g['mean'] ** 2).clip(lower=0)
+        return g[list(by) + ['count', 'mean', 'variance']]
+
+    def daily(self, platform=None):
+        out = self.summary(('date',), platform)
+        out['date'] = pd.to_datetime(out['date']).dt.date
+        return out
@@ -0,0 +1,89 @@
+import re
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# CJK unified ideographs (+ extension A) — LIHKG / Telegram posts mix Cantonese and English
+CJK_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+LATIN_PATTERN = re.compile(r'[A-Za-z]')
+ZH_THRESHOLD = 0.3   # share of CJK among letters above which a post is routed to SnowNLP
+
+
+def detect_language(text):
+    """'zh' if CJK characters make up at least ZH_THRESHOLD of the letters, else 'en'."""
+    cjk = len(CJK_PATTERN.findall(text))
+    if not cjk:
+        return 'en'
+    latin = len(LATIN_PATTERN.findall(text))
+    return 'zh' if cjk / (cjk + latin) >= ZH_THRESHOLD else 'en'
+
+
+def score_text(text):
+    """Polarity in [-1, 1]: TextBlob for English, SnowNLP (rescaled from [0, 1]) for Chinese."""
+    if not text or not text.strip():
+        return 0.0
+    # backends are imported on first use: SnowNLP alone takes ~1 s to import
+    if detect_language(text) == 'zh':
+        from snownlp import SnowNLP
+        return 2.0 * SnowNLP(text).sentiments - 1.0
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+
+def _score_batch(texts):
+    return [score_text(t) for t in texts]
+
+
+class SentimentEngine:
+    """
+    Batch sentiment scorer. Duplicate texts are scored once (and remembered
+    across calls); large sets of new texts are split into batches and scored
+    on a process pool, started on first use and reused until close().
+    """
+
+    def __init__(self, workers=None, batch_size=2000, parallel_threshold=5000,
+                 max_memo=500_000):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.parallel_threshold = parallel_threshold
+        self.max_memo = max_memo   # bounds memory when streaming an unbounded feed
+        self._memo = {}
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool (a later call to score() starts a new one)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def score(self, texts):
+        texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+        codes, uniques = pd.factorize(texts)
+        new = [t for t in uniques if t not in self._memo]
+
+        if len(new) < self.parallel_threshold or self.workers == 1:
+            scores = _score_batch(new)
+        else:
+            batches = [new[i:i + self.batch_size] for i in range(0, len(new), self.batch_size)]
+            scores = [s for batch in self._executor().map(_score_batch, batches) for s in batch]
+        fresh = dict(zip(new, scores))
+        # resolve memo hits before any eviction, so this call never loses a score
+        unique_scores = np.array([fresh[t] if t in fresh else self._memo[t] for t in uniques],
+                                 dtype=float)
+
+        if len(self._memo) + len(fresh) > self.max_memo:
+            self._memo.clear()
+        self._memo.update(fresh)
+        return np.round(unique_scores[codes], 4)
+
+    def languages(self, texts):
+        texts = pd.Series(texts, dtype=object).fillna('').astype(str)
+        codes, uniques = pd.factorize(texts)
+        return np.array([detect_language(t) for t in uniques], dtype=object)[codes]
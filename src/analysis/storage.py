@@ -0,0 +1,161 @@
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    HAS_PARQUET = True
+except ImportError:   # pyarrow is optional — fall back to CSV storage
+    HAS_PARQUET = False
+
+RESULTS_NAME = "sentiment_results"
+CATEGORICAL_COLUMNS = ['platform', 'language']
+
+
+def _typed(df):
+    """Typed copy: datetime timestamp, categorical platform/language, string id."""
+    df = df.copy()
+    if 'timestamp' in df:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype('category')
+    if 'id' in df:
+        df['id'] = df['id'].astype(str)
+    return df
+
+
+class CsvStore:
+    """Processed sentiment results as a single CSV (the original layout)."""
+    fmt = 'csv'
+
+    def __init__(self, processed_path):
+        self.path = os.path.join(processed_path, RESULTS_NAME + ".csv")
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def columns(self):
+        return list(pd.read_csv(self.path, nrows=0).columns) if self.exists() else []
+
+    def write(self, df, append=False):
+        header = not (append and self.exists())
+        df.to_csv(self.path, mode='a' if append else 'w', header=header, index=False)
+
+    def read(self, columns=None):
+        df = pd.read_csv(self.path, usecols=columns, dtype={'id': str})
+        return _typed(df)
+
+    def drop_window(self, start, end, chunksize=50_000):
+        """Remove rows with start <= timestamp <= end; returns the number removed."""
+        tmp = self.path + '.tmp'
+        dropped = 0
+        for i, chunk in enumerate(pd.read_csv(self.path, chunksize=chunksize, dtype={'id': str})):
+            ts = pd.to_datetime(chunk['timestamp'])
+            in_window = (ts >= start) & (ts <= end)
+            dropped += int(in_window.sum())
+            chunk[~in_window].to_csv(tmp, mode='w' if i == 0 else 'a', header=(i == 0),
+                                     index=False)
+        os.replace(tmp, self.path)
+        return dropped
+
+    def reset(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def export_csv(self, path):
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            shutil.copyfile(self.path, path)
+        return path
+
+
+class ParquetStore:
+    """
+    Processed sentiment results as a Parquet dataset partitioned by day:
+    sentiment_results/date=YYYY-MM-DD/part-*.parquet. Timestamps are stored
+    typed and platform/language as dictionary-encoded categoricals, so readers
+    skip CSV parsing and can load just the columns they need.
+    """
+    fmt = 'parquet'
+
+    def __init__(self, processed_path):
+        self.path = os.path.join(processed_path, RESULTS_NAME)
+
+    def _dataset(self):
+        return ds.dataset(self.path, format='parquet', partitioning='hive')
+
+    def exists(self):
+        return os.path.isdir(self.path) and any(
+            f.endswith('.parquet') for _, _, files in os.walk(self.path) for f in files)
+
+    def columns(self):
+        if not self.exists():
+            return []
+        return [c for c in self._dataset().schema.names if c != 'date']
+
+    def write(self, df, append=False):
+        if not append:
+            self.reset()
+        if df.empty:
+            return
+        df = _typed(df)
+        df['date'] = df['timestamp'].dt.strftime('%Y-%m-%d')
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False), self.path,
+            partition_cols=['date'],
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+    def read(self, columns=None):
+        table = self._dataset().to_table(columns=columns)
+        df = table.to_pandas()
+        if columns is None and 'date' in df:
+            df = df.drop(columns='date')
+        for col in CATEGORICAL_COLUMNS:
+            if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        return df
+
+    def drop_window(self, start, end, chunksize=None):
+        """Rewrite only the day partitions overlapping [start, end]; returns rows removed."""
+        dropped = 0
+        for day in pd.date_range(start.normalize(), end.normalize(), freq='D'):
+            part = os.path.join(self.path, f"date={day:%Y-%m-%d}")
+            if not os.path.isdir(part):
+                continue
+            df = pd.read_parquet(part)
+            in_window = (df['timestamp'] >= start) & (df['timestamp'] <= end)
+            dropped += int(in_window.sum())
+            shutil.rmtree(part)
+            if not in_window.all():
+                self.write(df[~in_window], append=True)
+        return dropped
+
+    def reset(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def import_csv(self, csv_path, chunksize=50_000):
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype={'id': str}):
+            self.write(chunk, append=True)
+
+    def export_csv(self, path):
+        """Stream partitions, oldest day first, into one CSV."""
+        for i, part in enumerate(sorted(os.listdir(self.path))):
+            df = pd.read_parquet(os.path.join(self.path, part)).sort_values('timestamp')
+            df.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        return path
+
+
+def open_store(processed_path, fmt=None):
+    """Results store for `fmt` ('parquet' / 'csv'); default Parquet when pyarrow is installed."""
+    fmt = fmt or ('parquet' if HAS_PARQUET else 'csv')
+    if fmt == 'parquet':
+        if not HAS_PARQUET:
+            raise ImportError("Parquet storage requires pyarrow (pip install pyarrow)")
+        return ParquetStore(processed_path)
+    return CsvStore(processed_path)
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from analysis.sentiment import CJK_PATTERN
+from analysis.tokenizer import load_stopwords
+
+TERMS_NAME = "term_frequency.json"
+WORD_PATTERN = re.compile(r'\w')   # tokens with no letter, digit or CJK character are punctuation
+
+
+def stopword_mask(terms, stopwords):
+    """
+    Boolean array, True where a term is a stopword. The list is bilingual:
+    English entries match case-insensitively, Chinese entries exactly.
+    """
+    chinese = {w for w in stopwords if CJK_PATTERN.search(w)}
+    english = {w.lower() for w in stopwords if not CJK_PATTERN.search(w)}
+    return np.fromiter(((t in chinese) if CJK_PATTERN.search(t) else (t.lower() in english)
+                        for t in terms), dtype=bool, count=len(terms))
+
+
+class TermFrequency:
+    """
+    Corpus term statistics built from the processor's tokens: occurrences of
+    each term and the number of posts containing it. Posts in one duplicate
+    cluster share its tokens, so each cluster is tokenized once and counted
+    with its post count as weight. Both are additive Counters, so chunks and
+    live batches are folded in as they are tokenized.
+
+    Word-cloud frequencies are computed over the vocabulary with NumPy —
+    optionally TF-IDF weighted against a background corpus — so their cost
+    depends on the vocabulary size, not on the number of posts.
+
+    Stored as term_frequency.json next to the processed results; without a
+    `processed_path` the corpus lives in memory only (e.g. a background built
+    from a baseline period).
+    """
+
+    def __init__(self, processed_path=None):
+        self.path = os.path.join(processed_path, TERMS_NAME) if processed_path else None
+        self.counts = Counter()     # term → occurrences
+        self.doc_freq = Counter()   # term → documents containing it
+        self.docs = 0
+        if self.exists():
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.counts = Counter(state['counts'])
+            self.doc_freq = Counter(state['doc_freq'])
+            self.docs = state['docs']
+
+    @classmethod
+    def from_tokens(cls, token_lists, weights=None):
+        corpus = cls()
+        corpus.update(token_lists, weights)
+        return corpus
+
+    def exists(self):
+        return self.path is not None and os.path.exists(self.path)
+
+    def update(self, token_lists, weights=None):
+        """Fold token lists into the counts; `weights[i]` posts share token list i (default 1)."""
+        weights = [1] * len(token_lists) if weights is None else weights
+        for tokens, weight in zip(token_lists, weights):
+            weight = int(weight)
+            for term, n in Counter(tokens).items():
+                self.counts[term] += n * weight
+                self.doc_freq[term] += weight
+            self.docs += weight
+
+    def reset(self):
+        self.counts, self.doc_freq, self.docs = Counter(), Counter(), 0
+        if self.exists():
+            os.remove(self.path)
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'docs': self.docs, 'counts': self.counts, 'doc_freq': self.doc_freq},
+                      f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    # ── queries ──────────────────────────────────────────────────────────────
+    def idf(self, terms):
+        """Smoothed inverse document frequency of `terms` in this corpus (1.0 for a new term in an empty one)."""
+        df = np.fromiter((self.doc_freq.get(t, 0) for t in terms), dtype=float, count=len(terms))
+        return np.log((1 + self.docs) / (1 + df)) + 1
+
+    def frequencies(self, top=150, stopwords=None, tfidf=False, background=None, min_count=1):
+        """
+        {term: weight} for the `top` heaviest terms, ready for
+        WordCloud.generate_from_frequencies. Weights are raw counts, or with
+        `tfidf` counts × IDF in `background` (default: this corpus), which
+        pushes down terms that appear in nearly every post. `stopwords`
+        defaults to config/stopwords.txt (English and Chinese).
+        """
+        if not self.counts:
+            return {}
+        terms = np.array(list(self.counts), dtype=object)
+        weights = np.fromiter(self.counts.values(), dtype=float, count=len(terms))
+        stopwords = load_stopwords() if stopwords is None else stopwords
+        keep = (weights >= min_count) & ~stopword_mask(terms, stopwords)
+        keep &= np.fromiter((bool(WORD_PATTERN.search(t)) for t in terms), dtype=bool, count=len(terms))
+        if tfidf:
+            weights = weights * (self if background is None else background).idf(terms)
+
+        idx = np.flatnonzero(keep)
+        if top is not None and top < len(idx):
+            idx = idx[np.argpartition(-weights[idx], top - 1)[:top]]
+        idx = idx[np.argsort(-weights[idx], kind='stable')]
+        return {terms[i]: float(weights[i]) for i in idx}
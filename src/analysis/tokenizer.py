@@ -0,0 +1,97 @@
+import hashlib
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+STOPWORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), "config", "stopwords.txt")
+
+
+@lru_cache(maxsize=None)
+def load_stopwords(path=STOPWORDS_PATH):
+    """Stopword frozenset from `path` (one term per line, # comments), loaded once per path."""
+    if not os.path.exists(path):
+        return frozenset()
+    with open(path, encoding='utf-8') as f:
+        return frozenset(line.strip() for line in f
+                         if line.strip() and not line.lstrip().startswith('#'))
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def _init_worker():
+    import jieba
+    jieba.setLogLevel(60)
+    jieba.initialize()   # load the dictionary once per worker, not per batch
+
+
+def _segment_batch(args):
+    import jieba   # deferred so importing the analysis stage does not load jieba
+    texts, stopwords = args
+    return [tuple(w for w in jieba.lcut(t) if len(w.strip()) > 1 and w not in stopwords)
+            for t in texts]
+
+
+class Tokenizer:
+    """
+    Per-document jieba tokenizer. Identical documents (by content hash) are
+    segmented once and cached; large sets of new documents are segmented in
+    batches on a process pool whose workers load the jieba dictionary once;
+    the pool is started on first use and reused until close().
+    """
+
+    def __init__(self, stopwords=None, workers=None, batch_size=1000, parallel_threshold=2000,
+                 max_cache=500_000):
+        self.stopwords = frozenset(stopwords) if stopwords is not None else load_stopwords()
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.parallel_threshold = parallel_threshold
+        self.max_cache = max_cache
+        self._cache = {}
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool (a later call to tokenize() starts a new one)."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def tokenize(self, texts):
+        """List of token tuples, one per input document."""
+        texts = ['' if t is None or t != t else str(t) for t in texts]
+        keys = [content_hash(t) for t in texts]
+        new = {}
+        for k, t in zip(keys, texts):
+            if k not in self._cache and k not in new:
+                new[k] = t
+
+        docs = list(new.values())
+        if len(docs) < self.parallel_threshold or self.workers == 1:
+            tokens = _segment_batch((docs, self.stopwords))
+        else:
+            batches = [(docs[i:i + self.batch_size], self.stopwords)
+                       for i in range(0, len(docs), self.batch_size)]
+            tokens = [doc for batch in self._executor().map(_segment_batch, batches) for doc in batch]
+
+        fresh = dict(zip(new, tokens))
+        # resolve cache hits before any eviction, so this call never loses a document
+        result = [fresh[k] if k in fresh else self._cache[k] for k in keys]
+        if len(self._cache) + len(fresh) > self.max_cache:
+            self._cache.clear()
+        self._cache.update(fresh)
+        return result
+
+    @staticmethod
+    def term_counts(token_lists):
+        counts = Counter()
+        for tokens in token_lists:
+            counts.update(tokens)
+        return counts
@@ -0,0 +1,156 @@
+# Per-platform adapters for the async Collector: request shape, pagination and row normalisation
+
+import re
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from collectors.config import is_placeholder
+
+LOCAL_TZ = 'Asia/Hong_Kong'   # raw archive timestamps are HK local time
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def local_time(value, unit=None):
+    """ISO string / epoch → 'YYYY-mm-dd HH:MM:SS' in HK time, the archive's format."""
+    ts = pd.Timestamp(value, unit=unit) if unit else pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.tz_convert(LOCAL_TZ).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class PlatformAdapter(ABC):
+    """
+    One platform's API. `pages()` is an async generator of (rows, cursor):
+    rows are raw-feed dicts (id, timestamp, platform, user, content) and
+    cursor is the JSON-able state to resume from once those rows are stored.
+    Requests go through `fetch(platform, url, params, headers)`, which owns
+    pooling, rate limiting and retries.
+    """
+    name = None
+    platform = None
+    default_base_url = None
+    sources_key = None
+
+    def __init__(self, settings, page_size=100, max_pages=50):
+        self.settings = settings or {}
+        self.base_url = self.settings.get('base_url', self.default_base_url).rstrip('/')
+        self.page_size = self.settings.get('page_size', page_size)
+        self.max_pages = self.settings.get('max_pages', max_pages)
+        self.rate = self.settings.get('rate_per_s', 1.0)
+
+    def sources(self, config):
+        return list(self.settings.get(self.sources_key) or [])
+
+    def enabled(self):
+        return True
+
+    def headers(self):
+        return {}
+
+    @abstractmethod
+    async def pages(self, fetch, source, cursor):
+        """Yield (rows, cursor) for `source`, starting after `cursor` (None: first run)."""
+
+
+class TwitterAdapter(PlatformAdapter):
+    """X / Twitter API v2 recent search; resumes from the newest tweet id seen."""
+    name = 'twitter'
+    platform = 'Twitter'
+    default_base_url = 'https://api.twitter.com'
+    sources_key = 'queries'
+
+    def sources(self, config):
+        # Defaults to the shared search keywords
+        return list(self.settings.get('queries') or config.get('search_keywords') or [])
+
+    def enabled(self):
+        return not is_placeholder(self.settings.get('bearer_token'))
+
+    def headers(self):
+        return {'Authorization': f"Bearer {self.settings['bearer_token']}"}
+
+    async def pages(self, fetch, source, cursor):
+        since_id = (cursor or {}).get('since_id')
+        params = {'query': source, 'max_results': min(max(self.page_size, 10), 100),
+                  'tweet.fields': 'created_at,author_id', 'expansions': 'author_id',
+                  'user.fields': 'username'}
+        if since_id:
+            params['since_id'] = since_id
+        newest = since_id
+        for page in range(self.max_pages):
+            body = await fetch(self.name, f"{self.base_url}/2/tweets/search/recent", params, self.headers())
+            meta = body.get('meta', {})
+            if page == 0 and meta.get('newest_id'):
+                newest = meta['newest_id']
+            users = {u['id']: u.get('username', u['id'])
+                     for u in body.get('includes', {}).get('users', [])}
+            rows = [{'id': f"tw_{t['id']}", 'timestamp': local_time(t['created_at']),
+                     'platform': self.platform, 'user': users.get(t.get('author_id'), t.get('author_id')),
+                     'content': t['text']} for t in body.get('data', [])]
+            next_token = meta.get('next_token')
+            # results are newest-first: only advance since_id once the whole window is read
+            done = not next_token or page == self.max_pages - 1
+            yield rows, {'since_id': newest if done else since_id}
+            if done:
+                return
+            params['next_token'] = next_token
+
+
+class TelegramAdapter(PlatformAdapter):
+    """
+    Telegram group history through an HTTP bridge in front of an MTProto
+    client (e.g. a small Telethon service): GET /channels/<group>/messages
+    ?after_id=&limit= returning {"messages": [{id, date, sender, text}]},
+    oldest first. Resumes from the last message id stored.
+    """
+    name = 'telegram'
+    platform = 'Telegram'
+    default_base_url = 'http://127.0.0.1:8081'
+    sources_key = 'groups'
+
+    def headers(self):
+        token = self.settings.get('bridge_token')
+        return {} if is_placeholder(token) else {'Authorization': f"Bearer {token}"}
+
+    async def pages(self, fetch, source, cursor):
+        after_id = (cursor or {}).get('after_id', 0)
+        for _ in range(self.max_pages):
+            body = await fetch(self.name, f"{self.base_url}/channels/{source}/messages",
+                               {'after_id': after_id, 'limit': self.page_size}, self.headers())
+            messages = [m for m in body.get('messages', []) if m.get('text')]
+            rows = [{'id': f"tg_{source}_{m['id']}", 'timestamp': local_time(m['date']),
+                     'platform': self.platform, 'user': str(m.get('sender', '')),
+                     'content': m['text']} for m in messages]
+            if body.get('messages'):
+                after_id = max(after_id, max(m['id'] for m in body['messages']))
+            yield rows, {'after_id': after_id}
+            if len(body.get('messages', [])) < self.page_size:
+                return
+
+
+class LihkgAdapter(PlatformAdapter):
+    """LIHKG thread replies, one page per request; resumes from the last page read."""
+    name = 'lihkg'
+    platform = 'LIHKG'
+    default_base_url = 'https://lihkg.com/api_v2'
+    sources_key = 'threads'
+
+    async def pages(self, fetch, source, cursor):
+        page = (cursor or {}).get('page', 1)   # the last page may have grown since
+        for _ in range(self.max_pages):
+            body = await fetch(self.name, f"{self.base_url}/thread/{source}/page/{page}",
+                               {'order': 'reply'}, self.headers())
+            response = body.get('response', {})
+            rows = [{'id': f"lihkg_{source}_{p['post_id']}",
+                     'timestamp': local_time(p['reply_time'], unit='s'),
+                     'platform': self.platform, 'user': p.get('user_nickname', ''),
+                     'content': TAG_PATTERN.sub(' ', p.get('msg', '')).strip()}
+                    for p in response.get('item_data', [])]
+            yield rows, {'page': page}
+            if page >= int(response.get('total_page', page)):
+                return
+            page += 1
+
+
+ADAPTERS = {cls.name: cls for cls in (TwitterAdapter, TelegramAdapter, LihkgAdapter)}
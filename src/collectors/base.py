@@ -1,20 +1,235 @@
 # Data collection logic for various platforms
 
+import asyncio
+import json
+import os
+import time
+
+import httpx
+import pandas as pd
+
+from collectors.adapters import ADAPTERS
+
+MAX_RETRIES = 3
+RETRY_BACKOFF_S = 1.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RAW_COLUMNS = ['id', 'timestamp', 'platform', 'user', 'content']
+
+
+class AsyncRateLimiter:
+    """Token bucket for one platform's API quota (`rate` requests/s, `burst` at once)."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CursorStore:
+    """Pagination cursors per (platform, source), so the next run resumes where this one stopped."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.cursors = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.cursors = json.load(f)
+
+    def get(self, platform, source):
+        return self.cursors.get(platform, {}).get(str(source))
+
+    def set(self, platform, source, cursor):
+        self.cursors.setdefault(platform, {})[str(source)] = cursor
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.cursors, f, indent=2)
+        os.replace(tmp, self.path)
+
+
 class Collector:
-    def __init__(self, config):
-        self.config = config
+    """
+    Async multi-platform collection. Every (platform, source) pair pages
+    through its API concurrently over one pooled HTTP client; each platform
+    has its own rate limit, and pages go through a bounded queue to a single
+    consumer that hands batches of rows to a sink (e.g. DataProcessor.ingest),
+    so a slow sink applies backpressure instead of buffering the feed in
+    memory. Cursors are saved only after their rows have been consumed.
+
+    config: the parsed config YAML (see config/config_template.yaml)
+    """
+
+    def __init__(self, config, cursor_path=None):
+        self.config = config or {}
+        settings = self.config.get('collection') or {}
+        self.max_connections = settings.get('max_connections', 20)
+        self.queue_size = settings.get('queue_size', 64)
+        self.batch_rows = settings.get('batch_rows', 500)
+        self.timeout = settings.get('timeout_s', 20)
+        self.adapters = {name: cls(self.config.get(name), settings.get('page_size', 100),
+                                   settings.get('max_pages', 50))
+                         for name, cls in ADAPTERS.items()}
+        self.cursors = CursorStore(cursor_path)
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats():
+        return {'requests': 0, 'retries': 0, 'pages': 0, 'rows': 0, 'errors': 0}
+
+    def sources(self, platforms=None):
+        """(platform, source) pairs for every enabled adapter with configured sources."""
+        pairs = []
+        for name, adapter in self.adapters.items():
+            if platforms and name not in platforms:
+                continue
+            if adapter.enabled():
+                pairs += [(name, source) for source in adapter.sources(self.config)]
+        return pairs
+
+    # ── async core ───────────────────────────────────────────────────────────
+    async def _fetch(self, platform, url, params, headers):
+        limiter = self._limiters[platform]
+        for attempt in range(1, MAX_RETRIES + 2):
+            await limiter.acquire()
+            self.stats['requests'] += 1
+            try:
+                resp = await self._client.get(url, params=params, headers=headers)
+                if resp.status_code not in RETRY_STATUS:
+                    resp.raise_for_status()
+                    return resp.json()
+                delay = float(resp.headers.get('retry-after', RETRY_BACKOFF_S * 2 ** (attempt - 1)))
+                error = httpx.HTTPStatusError(f"HTTP {resp.status_code}", request=resp.request,
+                                              response=resp)
+            except httpx.TransportError as e:
+                delay, error = RETRY_BACKOFF_S * 2 ** (attempt - 1), e
+            if attempt > MAX_RETRIES:
+                raise error
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+    async def _produce(self, queue, platform, source):
+        adapter = self.adapters[platform]
+        try:
+            async for rows, cursor in adapter.pages(self._fetch, source, self.cursors.get(platform, source)):
+                self.stats['pages'] += 1
+                await queue.put((platform, source, rows, cursor))
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            self.stats['errors'] += 1
+            print(f"  {platform}:{source} stopped: {e}")
+
+    async def _consume(self, queue, sink):
+        batch, cursors = [], {}
+        while True:
+            item = await queue.get()
+            if item is not None:
+                platform, source, rows, cursor = item
+                batch += rows
+                cursors[(platform, source)] = cursor
+            if batch and (item is None or len(batch) >= self.batch_rows or queue.empty()):
+                df = pd.DataFrame(batch, columns=RAW_COLUMNS)
+                # scoring is CPU-bound: run it off the loop so fetching continues meanwhile
+                await asyncio.get_running_loop().run_in_executor(None, sink, df)
+                self.stats['rows'] += len(batch)
+                batch = []
+            if not batch and cursors:
+                for (platform, source), cursor in cursors.items():
+                    self.cursors.set(platform, source, cursor)
+                self.cursors.save()
+                cursors = {}
+            if item is None:
+                return
+
+    async def collect(self, sink, sources=None):
+        """Run every source concurrently, feeding row batches to `sink(df)`; returns this run's stats."""
+        sources = self.sources() if sources is None else sources
+        self.stats = self._new_stats()
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        timeout = httpx.Timeout(self.timeout, pool=None)   # waiting for a pooled connection is not an error
+        self._limiters = {name: AsyncRateLimiter(a.rate, a.settings.get('burst', 1))
+                          for name, a in self.adapters.items()}
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            self._client = client
+            consumer = asyncio.create_task(self._consume(queue, sink))
+            producers = asyncio.ensure_future(
+                asyncio.gather(*(self._produce(queue, p, s) for p, s in sources)))
+            await asyncio.wait({consumer, producers}, return_when=asyncio.FIRST_COMPLETED)
+            if consumer.done():   # the sink failed: stop fetching rather than block on a full queue
+                producers.cancel()
+                await asyncio.gather(producers, return_exceptions=True)
+                consumer.result()
+            await queue.put(None)
+            await consumer
+        return dict(self.stats)
+
+    # ── sync entry points ────────────────────────────────────────────────────
+    def run(self, processor=None, monitor=None, archive_path=None, platforms=None):
+        """
+        Collect every configured source once. Rows are appended to the raw
+        archive at `archive_path` (if given) and scored straight into
+        `processor` (a DataProcessor, if given). Returns the collected rows.
+        """
+        collected = []
+
+        def sink(df):
+            df = processor.unprocessed(df) if processor is not None else df.drop_duplicates('id')
+            if archive_path:
+                append_to_archive(df, archive_path)
+            if processor is not None:
+                processor.ingest(df, monitor=monitor)
+            collected.append(df)
+
+        sources = self.sources(platforms)
+        print(f"Collecting {len(sources)} source(s) over up to {self.max_connections} connection(s)...")
+        start = time.perf_counter()
+        stats = asyncio.run(self.collect(sink, sources))
+        print(f"Collected {stats['rows']:,} row(s): {stats['requests']} request(s), "
+              f"{stats['retries']} retried, {stats['errors']} source error(s) "
+              f"in {time.perf_counter() - start:.1f}s")
+        return pd.concat(collected, ignore_index=True) if collected else pd.DataFrame(columns=RAW_COLUMNS)
+
+    def _collect_one(self, platform, source):
+        rows = []
+        asyncio.run(self.collect(lambda df: rows.extend(df.to_dict('records')), [(platform, source)]))
+        return rows
 
     def collect_twitter(self, query):
-        """Mock twitter collection."""
+        """Twitter recent search for one query."""
         print(f"Collecting Twitter data for: {query}")
-        return []
+        return self._collect_one('twitter', query)
 
     def collect_telegram(self, group_id):
-        """Mock telegram collection."""
+        """Telegram group history via the configured bridge."""
         print(f"Collecting Telegram data for: {group_id}")
-        return []
+        return self._collect_one('telegram', group_id)
 
     def collect_lihkg(self, thread_id):
-        """Mock LIHKG collection."""
+        """LIHKG thread replies."""
         print(f"Collecting LIHKG data for: {thread_id}")
-        return []
+        return self._collect_one('lihkg', thread_id)
+
+
+def append_to_archive(df, path):
+    """Append rows to the raw feed CSV, aligned to its existing header."""
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        columns = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=columns).to_csv(path, mode='a', header=False, index=False)
+    else:
+        df.to_csv(path, index=False)
@@ -0,0 +1,25 @@
+# Configuration loading for the collectors
+
+import os
+
+import yaml
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'config')
+CONFIG_PATH = os.path.join(CONFIG_DIR, 'config.yaml')
+TEMPLATE_PATH = os.path.join(CONFIG_DIR, 'config_template.yaml')
+
+
+def is_placeholder(value):
+    """True for unset credentials ("YOUR_API_KEY" style values from the template)."""
+    return value is None or (isinstance(value, str) and (not value or value.startswith('YOUR_')))
+
+
+def load_config(path=None):
+    """
+    Read the YAML config: `path`, else config/config.yaml, else the template
+    (whose placeholder credentials leave the live collectors disabled).
+    """
+    if path is None:
+        path = CONFIG_PATH if os.path.exists(CONFIG_PATH) else TEMPLATE_PATH
+    with open(path, encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
@@ -1,73 +1,191 @@
 import pandas as pd
-import random
-from datetime import datetime, timedelta
+import numpy as np
+import argparse
 import os
 
-def generate_mock_data():
-    platforms = ['Twitter', 'LIHKG', 'Telegram']
-    
-    positive_contents = [
-        "HashKey's UI is so clean, finally a licensed exchange that feels premium! #HashKey",
-        "Just finished my KYC on HashKey. Super fast and professional. Secure trading is the way.",
-        "Excited for Bitcoin Pizza Day 2026! Can't wait to see what HashKey has planned.",
-        "The safest place to hold BTC in HK. Compliance matters after FTX. #HKWeb3",
-        "HashKey's fiat on-ramp is a lifesaver. Direct bank transfer is so much better than C2C.",
-        "HK's regulatory framework is leading the way. HashKey is the gold standard."
-    ]
-    
-    negative_contents = [
-        "Why is HashKey so boring? No memecoins, no leverage... just plain tokens. #Degen",
-        "Strict KYC is such a pain. I miss the offshore days. #HashKey #Crypto",
-        "Withdrawal took longer than expected. Still better than nothing I guess.",
-        "The 'Professional Investor' requirement is so elitist. What about retail? #HKWeb3",
-        "High fees on licensed exchanges compared to DEXs. Why bother?",
-        "No USDT pairs? This is so restrictive for active traders."
-    ]
-    
-    neutral_contents = [
-        "Checking out the new HashKey update. #HKWeb3 #Crypto",
-        "Bitcoin Pizza Day is coming. May 22 is a big day for crypto history.",
-        "SFC's new guidelines on VATP are out. Interesting developments.",
-        "Anyone using HashKey for institutional custody? Looking for reviews.",
-        "Bitcoin price holding steady at $100k. #BTC",
-        "HashKey vs OSL - which one has better liquidity?"
-    ]
-
-    data = []
-    start_date = datetime(2025, 5, 1)
-    
-    for i in range(500):
-        platform = random.choice(platforms)
-        timestamp = start_date + timedelta(days=random.randint(0, 30), hours=random.randint(0, 23))
-        
-        roll = random.random()
-        if roll < 0.4:
-            content = random.choice(positive_contents)
-            sentiment_val = random.uniform(0.1, 0.8)
-        elif roll < 0.7:
-            content = random.choice(neutral_contents)
-            sentiment_val = random.uniform(-0.1, 0.1)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PARQUET = True
+except ImportError:   # pyarrow is optional — CSV output only
+    HAS_PARQUET = False
+
+PLATFORMS = ['Twitter', 'LIHKG', 'Telegram']
+
+# (positive, neutral, negative) templates per language
+TEMPLATES = {
+    'en': {
+        'positive': [
+            "HashKey's UI is so clean, finally a licensed exchange that feels premium! #HashKey",
+            "Just finished my KYC on HashKey. Super fast and professional. Secure trading is the way.",
+            "Excited for Bitcoin Pizza Day 2026! Can't wait to see what HashKey has planned.",
+            "The safest place to hold BTC in HK. Compliance matters after FTX. #HKWeb3",
+            "HashKey's fiat on-ramp is a lifesaver. Direct bank transfer is so much better than C2C.",
+            "HK's regulatory framework is leading the way. HashKey is the gold standard."
+        ],
+        'negative': [
+            "Why is HashKey so boring? No memecoins, no leverage... just plain tokens. #Degen",
+            "Strict KYC is such a pain. I miss the offshore days. #HashKey #Crypto",
+            "Withdrawal took longer than expected. Still better than nothing I guess.",
+            "The 'Professional Investor' requirement is so elitist. What about retail? #HKWeb3",
+            "High fees on licensed exchanges compared to DEXs. Why bother?",
+            "No USDT pairs? This is so restrictive for active traders."
+        ],
+        'neutral': [
+            "Checking out the new HashKey update. #HKWeb3 #Crypto",
+            "Bitcoin Pizza Day is coming. May 22 is a big day for crypto history.",
+            "SFC's new guidelines on VATP are out. Interesting developments.",
+            "Anyone using HashKey for institutional custody? Looking for reviews.",
+            "Bitcoin price holding steady at $100k. #BTC",
+            "HashKey vs OSL - which one has better liquidity?"
+        ],
+    },
+    # Cantonese / Traditional Chinese, as posted on LIHKG and HK Telegram groups
+    'zh': {
+        'positive': [
+            "HashKey 個介面好靚，終於有間持牌交易所用得舒服！#HashKey",
+            "喺 HashKey 做完 KYC，好快好專業，安全交易先係王道。",
+            "好期待 2026 比特幣披薩節！睇吓 HashKey 有咩安排。",
+            "FTX 之後先知合規幾重要，香港放 BTC 最安全就係 HashKey。#HKWeb3",
+            "HashKey 法幣入金真係救命，銀行直接轉賬好過 C2C 好多。",
+            "香港監管框架行得好前，HashKey 係行業標準。"
+        ],
+        'negative': [
+            "HashKey 好悶，冇 meme 幣又冇槓桿，淨係得啲普通幣。#Degen",
+            "KYC 咁嚴真係好煩，懷念以前離岸嘅日子。#HashKey",
+            "提款慢過預期，不過總好過冇。",
+            "「專業投資者」門檻咁高，好離地，散戶點算？#HKWeb3",
+            "持牌交易所手續費貴過 DEX 好多，做乜要用？",
+            "冇 USDT 交易對，對活躍交易者嚟講限制太多。"
+        ],
+        'neutral': [
+            "睇緊 HashKey 新更新。#HKWeb3 #Crypto",
+            "比特幣披薩節就嚟，5月22號係加密貨幣歷史上嘅大日子。",
+            "證監會 VATP 新指引出咗，幾有趣。",
+            "有冇人用 HashKey 做機構託管？想聽下評價。",
+            "比特幣企穩喺十萬美金。#BTC",
+            "HashKey 同 OSL 邊間流動性好啲？"
+        ],
+    },
+}
+
+# Share of posts per sentiment class and the range simulated_sentiment is drawn from
+SENTIMENT_CLASSES = [
+    ('positive', 0.4, (0.1, 0.8)),
+    ('neutral', 0.3, (-0.1, 0.1)),
+    ('negative', 0.3, (-0.8, -0.1)),
+]
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'data', 'raw', 'social_feed_archived.csv')
+
+
+def _weights(mix, keys):
+    """Normalised probabilities for `keys` from a {key: weight} mix (missing keys → 0)."""
+    w = np.array([float(mix.get(k, 0)) for k in keys])
+    if w.sum() <= 0:
+        raise ValueError(f"mix {mix} has no positive weight for any of {keys}")
+    return w / w.sum()
+
+
+def generate_chunk(rng, start_row, n, start, end, platform_mix=None, language_mix=None, width=4):
+    """
+    `n` feed rows (ids from `start_row`, zero-padded to `width` digits) with
+    timestamps uniform over [start, end).
+    """
+    platforms = list(platform_mix) if platform_mix else PLATFORMS
+    p_platform = _weights(platform_mix, platforms) if platform_mix else None
+    languages = list(language_mix) if language_mix else ['en']
+    p_language = _weights(language_mix, languages) if language_mix else None
+
+    lang = rng.choice(len(languages), size=n, p=p_language)
+    cls = rng.choice(len(SENTIMENT_CLASSES), size=n, p=[share for _, share, _ in SENTIMENT_CLASSES])
+
+    # every (language, class) pool has the same template count, so pick an index once
+    pools = np.array([[TEMPLATES[lg][name] for name, _, _ in SENTIMENT_CLASSES] for lg in languages],
+                     dtype=object)
+    content = pools[lang, cls, rng.integers(0, pools.shape[2], size=n)]
+
+    lo = np.array([r[0] for _, _, r in SENTIMENT_CLASSES])[cls]
+    hi = np.array([r[1] for _, _, r in SENTIMENT_CLASSES])[cls]
+    sentiment = np.round(rng.uniform(lo, hi), 2)
+
+    span = int((end - start).total_seconds())
+    seconds = rng.integers(0, span, size=n)
+    ids = pd.Series(np.arange(start_row, start_row + n)).astype(str).str.zfill(width)
+    return pd.DataFrame({
+        'id': 'raw_' + ids,
+        'timestamp': (start + pd.to_timedelta(seconds, unit='s')).strftime('%Y-%m-%d %H:%M:%S'),
+        'platform': np.asarray(platforms, dtype=object)[rng.choice(len(platforms), size=n, p=p_platform)],
+        'user': 'crypto_user_' + pd.Series(rng.integers(100, 1000, size=n)).astype(str),
+        'content': content,
+        'simulated_sentiment': sentiment,
+    })
+
+
+def generate_mock_data(rows=500, start='2025-05-01', days=31, platform_mix=None, language_mix=None,
+                       seed=4150, output_path=None, chunksize=1_000_000):
+    """
+    Synthetic social feed of `rows` posts between `start` and `start + days`,
+    written in chunks of `chunksize` rows so tens of millions of rows never
+    sit in memory at once. Output is CSV, or Parquet when `output_path` ends
+    in .parquet. Mixes are {name: weight} dicts, e.g. platform_mix={'LIHKG': 2,
+    'Twitter': 1}, language_mix={'en': 0.7, 'zh': 0.3}. Returns the output path.
+    """
+    output_path = output_path or DEFAULT_OUTPUT
+    if language_mix:
+        unknown = set(language_mix) - set(TEMPLATES)
+        if unknown:
+            raise ValueError(f"no templates for language(s) {sorted(unknown)}; have {sorted(TEMPLATES)}")
+    parquet = output_path.endswith('.parquet')
+    if parquet and not HAS_PARQUET:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start)
+    end = start + pd.Timedelta(days=days)
+    width = max(4, len(str(rows - 1)))   # one id width for the whole file, so ids sort in row order
+    writer = None
+    for offset in range(0, rows, chunksize):
+        df = generate_chunk(rng, offset, min(chunksize, rows - offset), start, end,
+                            platform_mix, language_mix, width)
+        if parquet:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
         else:
-            content = random.choice(negative_contents)
-            sentiment_val = random.uniform(-0.8, -0.1)
-            
-        data.append({
-            'id': f'raw_{i:04d}',
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'platform': platform,
-            'user': f'crypto_user_{random.randint(100, 999)}',
-            'content': content,
-            'simulated_sentiment': round(sentiment_val, 2)
-        })
-        
-    df = pd.DataFrame(data)
-    # Correct relative path
-    output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'raw')
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    output_path = os.path.join(output_dir, 'social_feed_archived.csv')
-    df.to_csv(output_path, index=False)
-    print(f"Mock raw data generated: 500 rows saved to {output_path}")
+            df.to_csv(output_path, mode='w' if offset == 0 else 'a', header=(offset == 0), index=False)
+        if rows > chunksize:
+            print(f"  {offset + len(df):,} / {rows:,} rows written")
+    if writer is not None:
+        writer.close()
+    print(f"Mock raw data generated: {rows:,} rows saved to {output_path}")
+    return output_path
+
+
+def _parse_mix(text):
+    """'LIHKG=2,Twitter=1' → {'LIHKG': 2.0, 'Twitter': 1.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
 
 if __name__ == "__main__":
-    generate_mock_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Synthetic social feed generator (load testing)")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--start", default='2025-05-01', help="first day (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--platform-mix", type=_parse_mix, metavar="NAME=W,...",
+                        help="e.g. LIHKG=0.5,Twitter=0.3,Telegram=0.2 (default: equal)")
+    parser.add_argument("--language-mix", type=_parse_mix, metavar="LANG=W,...",
+                        help="en / zh weights, e.g. en=0.7,zh=0.3 (default: en only)")
+    parser.add_argument("--seed", type=int, default=4150)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--out", default=None, help="output .csv or .parquet (default: the raw archive)")
+    args = parser.parse_args()
+    generate_mock_data(args.rows, args.start, args.days, args.platform_mix, args.language_mix,
+                       args.seed, args.out, args.chunksize)
@@ -1,66 +1,251 @@
 import sys
 import os
+import json
 import time
 import logging
+import argparse
+import subprocess
+from datetime import datetime, timedelta
 
 # Set up logging to look like a real data pipeline
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Add path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SRC_DIR)
 
-from collectors.mock_generator import generate_mock_data
-from analysis.processor import DataProcessor
-from visualization.engine import VisualizationEngine
+# Paths
+BASE_DIR = os.path.dirname(SRC_DIR)
+RAW_DATA_PATH = os.path.join(BASE_DIR, "data", "raw", "social_feed_archived.csv")
+PROCESSED_DIR = os.path.join(BASE_DIR, "data", "processed")
+OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
+ANOMALY_STATE = os.path.join(PROCESSED_DIR, "anomaly_state.json")
+
+# Each stage imports its own dependencies when it runs, so a headless collect /
+# analyze job never loads matplotlib, seaborn or wordcloud. The modules listed
+# here are what the import benchmark times per stage.
+STAGES = ['collect', 'analyze', 'visualize']
+STAGE_MODULES = {
+    'collect':   ['collectors.mock_generator', 'collectors.config'],
+    'analyze':   ['analysis.processor', 'analysis.anomaly'],
+    'visualize': ['analysis.processor', 'analysis.anomaly', 'visualization.render',
+                  'visualization.engine'],
+}
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'wordcloud', 'jieba', 'snownlp', 'textblob', 'httpx']
+
+
+class PipelineRun:
+    """State shared by the stages of one run; the processor and anomaly monitor are built on first use."""
+
+    def __init__(self, options=None):
+        self.options = options or argparse.Namespace(chunksize=None, rebuild=False, backfill=None,
+                                                     export_csv=None)
+        self._processor = None
+        self._monitor = None
+        self.keywords = None
+
+    @property
+    def processor(self):
+        if self._processor is None:
+            from analysis.processor import DataProcessor
+            self._processor = DataProcessor(RAW_DATA_PATH, PROCESSED_DIR)
+        return self._processor
+
+    @property
+    def monitor(self):
+        # Online anomaly detection: state carries over between runs, so new rows are
+        # scored against the history without rereading it
+        if self._monitor is None:
+            from analysis.anomaly import AnomalyMonitor
+            self._monitor = AnomalyMonitor.load(ANOMALY_STATE, freq='D')
+        return self._monitor
+
+    def reset_monitor(self):
+        """Start anomaly detection over from an empty history, e.g. for a rebuild."""
+        from analysis.anomaly import AnomalyMonitor
+        self._monitor = AnomalyMonitor(freq='D')
+        return self._monitor
+
+    def save(self):
+        if self._monitor is not None:
+            self._monitor.save(ANOMALY_STATE)
+
+    def close(self):
+        if self._processor is not None:
+            self._processor.close()
+
+
+def stage_collect(run):
+    from collectors.mock_generator import generate_mock_data
+    from collectors.config import load_config
 
-def main():
-    print("""
-    =======================================================
-    HASHKEY SOCIAL LISTENING PIPELINE - RESEARCH MODE
-    =======================================================
-    """)
-    
-    # Paths
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    raw_data_path = os.path.join(base_dir, "data", "raw", "social_feed_archived.csv")
-    processed_dir = os.path.join(base_dir, "data", "processed")
-    output_dir = os.path.join(base_dir, "outputs")
-
-    # 1. Collection Phase
     logger.info("STAGE 1: DATA COLLECTION")
-    if not os.path.exists(raw_data_path):
+    if not os.path.exists(RAW_DATA_PATH):
         logger.warning("Local cache not found. Triggering mock collection...")
         generate_mock_data()
     else:
-        logger.info(f"Loading data from local archive: {raw_data_path}")
-    
-    # 2. Analysis Phase
+        logger.info(f"Loading data from local archive: {RAW_DATA_PATH}")
+
+    config = load_config()
+    if (config.get('collection') or {}).get('enabled'):
+        from collectors.base import Collector   # needs httpx; only imported for live runs
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+        logger.info("Live collection enabled: streaming new posts into the processor...")
+        collector = Collector(config, cursor_path=os.path.join(PROCESSED_DIR, "collector_cursors.json"))
+        collector.run(processor=run.processor, monitor=run.monitor, archive_path=RAW_DATA_PATH)
+
+
+def stage_analyze(run):
+    from analysis.processor import CHUNK_SIZE
+
     logger.info("STAGE 2: COMPUTATIONAL ANALYSIS")
-    processor = DataProcessor(raw_data_path, processed_dir)
-    df_processed, keywords = processor.process_sentiment()
-    logger.info(f"Analysis complete. Processed {len(df_processed)} social interactions.")
+    opts = run.options
+    chunksize = opts.chunksize or CHUNK_SIZE
+    if opts.rebuild:
+        # re-score the whole archive in streaming mode; the detector starts over with it
+        new_rows, run.keywords = run.processor.process_sentiment_streaming(chunksize,
+                                                                           monitor=run.reset_monitor())
+    else:
+        new_rows, run.keywords = run.processor.process_incremental(
+            backfill=opts.backfill, chunksize=chunksize, monitor=run.monitor)
+    run.save()
+    total = int(run.processor.rollup.table['count'].sum())   # from the rollup, not a store scan
+    logger.info(f"Analysis complete. {new_rows} new of {total} social interactions processed.")
+    if run.keywords:
+        logger.info("Top new terms: " + ", ".join(f"{t} ({n})" for t, n in run.keywords.most_common(10)))
+    if opts.export_csv is not None:
+        run.processor.export_csv(opts.export_csv or None)
+
+
+def stage_visualize(run):
+    from analysis.anomaly import AnomalyMonitor
+    from visualization.render import engine_job, render_all
 
-    # 3. Visualization Phase
     logger.info("STAGE 3: STRATEGIC VISUALIZATION")
-    engine = VisualizationEngine(output_dir=output_dir)
-    
-    logger.info("Generating WordCloud from NLP tokens...")
-    engine.generate_pain_points_wordcloud(df_processed)
-    
-    logger.info("Generating Sentiment Trends from processed timelines...")
-    engine.generate_sentiment_trend(df_processed)
-    
-    logger.info("Generating KOL Influence Matrix...")
-    engine.generate_influencer_matrix()
+    processor = run.processor
+    logger.info("Detecting sentiment anomalies over the daily rollup...")
+    anomalies = AnomalyMonitor(freq='D').replay_rollup(processor.rollup)
+    for event in anomalies:
+        logger.info(f"Anomaly: {event['platform']} {event['bucket']:%Y-%m-%d} {event['direction']} "
+                    f"(mean {event['value']:+.3f}, z={event['zscore']:+.2f})")
+
+    # The word cloud is drawn from the processor's corpus term counts (TF-IDF weighted
+    # so terms in nearly every post recede), not by re-tokenizing every post
+    frequencies = processor.terms.frequencies(top=150, tfidf=True)
+
+    # WordCloud, Sentiment Trend and KOL Matrix render in parallel worker processes
+    logger.info("Rendering WordCloud, Sentiment Trends and KOL Influence Matrix...")
+    render_all([
+        engine_job('generate_pain_points_wordcloud', OUTPUT_DIR, frequencies=frequencies),
+        engine_job('generate_sentiment_trend', OUTPUT_DIR, processor.rollup.daily(), anomalies=anomalies),
+        engine_job('generate_influencer_matrix', OUTPUT_DIR),
+    ], report_path=os.path.join(OUTPUT_DIR, "render_report_pipeline.json"))
+
+
+STAGE_FUNCTIONS = {'collect': stage_collect, 'analyze': stage_analyze, 'visualize': stage_visualize}
+
+
+def import_benchmark(repeat=3):
+    """
+    Import time of the CLI itself and of each stage's dependencies, each
+    measured in a fresh interpreter (best of `repeat`), plus the heavy
+    libraries every stage ends up loading.
+    """
+    code = ("import json, sys, time; sys.path.insert(0, {src!r}); t = time.perf_counter(); "
+            "import {modules}; s = time.perf_counter() - t; "
+            "print(json.dumps([s, [m for m in {heavy!r} if m in sys.modules]]))")
+    env = dict(os.environ, MPLBACKEND=os.environ.get('MPLBACKEND', 'Agg'))
+    every = list(dict.fromkeys(m for s in STAGES for m in STAGE_MODULES[s]))
+    targets = [('main (CLI startup)', ['main'])] + [(s, STAGE_MODULES[s]) for s in STAGES] \
+        + [('all stages', every)]
+
+    print(f"\n{'import':<22} {'seconds':>8}  heavy modules loaded")
+    for label, modules in targets:
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, '-c', code.format(src=SRC_DIR, modules=', '.join(modules),
+                                                                    heavy=HEAVY_MODULES)],
+                                 capture_output=True, text=True, env=env, check=True).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        seconds, heavy = min(runs)
+        print(f"{label:<22} {seconds:>8.3f}  {', '.join(heavy) or '-'}")
+
+
+def _parse_stages(text):
+    stages = [s.strip() for s in text.split(',') if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown or not stages:
+        raise argparse.ArgumentTypeError(f"unknown stage(s) {sorted(unknown)}; choose from {STAGES}")
+    return [s for s in STAGES if s in stages]   # always run in pipeline order
+
+
+def _backfill_window(start, end):
+    """
+    --backfill START END as datetimes for process_incremental, whose window is
+    inclusive at both ends; a date-only END covers that whole day.
+    """
+    window = datetime.fromisoformat(start), datetime.fromisoformat(end)
+    if len(end.strip()) <= len('YYYY-MM-DD'):
+        window = window[0], window[1] + timedelta(days=1) - timedelta(microseconds=1)
+    if window[0] > window[1]:
+        raise ValueError(f"START {start} is after END {end}")
+    return window
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HashKey social listening pipeline")
+    parser.add_argument("--stages", type=_parse_stages, default=STAGES, metavar="STAGE[,STAGE]",
+                        help=f"stages to run, in pipeline order (default: {','.join(STAGES)})")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="rows per chunk in the analyze stage (default: 50,000)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="re-score the whole archive in streaming mode instead of only new rows")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        help="re-score rows from START through END inclusive, e.g. 2025-05-20 2025-05-23 "
+                             "(a date-only END includes that whole day)")
+    parser.add_argument("--export-csv", nargs="?", const="", default=None, metavar="PATH",
+                        help="export the processed results to CSV after analysis "
+                             "(default: data/processed/sentiment_results.csv)")
+    parser.add_argument("--import-benchmark", action="store_true",
+                        help="time each stage's imports in a fresh interpreter and exit")
+    args = parser.parse_args(argv)
+    if args.rebuild and args.backfill:
+        parser.error("--rebuild already re-scores every row; drop --backfill")
+    if (args.rebuild or args.backfill or args.export_csv is not None or args.chunksize) \
+            and 'analyze' not in args.stages:
+        parser.error("--chunksize, --rebuild, --backfill and --export-csv need the analyze stage")
+    if args.backfill:
+        try:
+            args.backfill = _backfill_window(*args.backfill)
+        except ValueError as e:
+            parser.error(f"--backfill: {e}")
+
+    if args.import_benchmark:
+        import_benchmark()
+        return
+
+    print("""
+    =======================================================
+    HASHKEY SOCIAL LISTENING PIPELINE - RESEARCH MODE
+    =======================================================
+    """)
+
+    run = PipelineRun(args)
+    for stage in args.stages:
+        start = time.perf_counter()
+        STAGE_FUNCTIONS[stage](run)
+        logger.info(f"Stage '{stage}' finished in {time.perf_counter() - start:.2f}s")
+    run.save()
+    run.close()
 
     print(f"""
     =======================================================
-    SUCCESS: Pipeline Execution Complete.
-    Visualizations available in: {output_dir}
-    Raw logs archived in: data/processed/sentiment_results.csv
+    SUCCESS: Pipeline Execution Complete ({', '.join(args.stages)}).
+    Visualizations available in: {OUTPUT_DIR}
+    Processed results stored in: {PROCESSED_DIR}
     =======================================================
     """)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
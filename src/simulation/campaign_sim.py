@@ -7,39 +7,73 @@ the agent reasoning engine, inspired by the MiroFish / OASIS framework.
 
 Methodology:
   - 60 agents distributed across 2 target segments + RAVE-affected overlay
+    (or --population N agents, vectorised NumPy state; see population.py)
   - 3 scenarios (Pessimistic / Base / Optimistic) × 3 simulation rounds
   - Each round: DeepSeek evaluates agent-type reactions to campaign stimuli
   - Output: opinion shift, engagement rates, predicted KPI ranges
 
 Usage:
     export DEEPSEEK_API_KEY=sk-xxxx
-    python src/simulation/campaign_sim.py
+    python src/simulation/campaign_sim.py [--concurrency 6] [--rate 2.0]
+    python src/simulation/campaign_sim.py --cache-only   # replay from cache, no network
+    python src/simulation/campaign_sim.py --population 1000000
+    python src/simulation/campaign_sim.py --cache-only --replicates 2000   # percentile bands
+
+    DEEPSEEK_BASE_URL overrides the endpoint (e.g. a local OpenAI-compatible stub).
 
 Output:
     data/simulation/results.json
     data/simulation/summary.txt
+    (other backends write to data/simulation/<backend>/ unless --out-dir is given,
+    so the committed DeepSeek results are never overwritten)
 
 Section 6 | ZHAO Han (1155191400) | CUHK COMM4150
 """
 
 import os
 import json
-import time
-import random
 import sys
+import time
+import argparse
+from collections import Counter
 from datetime import datetime
 from openai import OpenAI
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from evaluator import CallStats, evaluate_concurrently
+from reaction_cache import ReactionCache, cache_key
+from local_backend import parametric_reaction
+from metrics import PhaseTimer, build_metrics, write_metrics
+from reaction_schema import InvalidReaction, JsonExtractor, extract_json, validate_reaction
+from population import AgentPopulation, allocate_counts, make_rng, predict_kpis
+from ensemble import run_ensemble, summarise
+from journal import RunJournal, run_fingerprint
+
 # ── Configuration ────────────────────────────────────────────────────────────
 
 API_KEY    = os.getenv("DEEPSEEK_API_KEY", "")
-BASE_URL   = "https://api.deepseek.com"
+BASE_URL   = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
 MODEL      = "deepseek-chat"
+TEMPERATURE = 0.4
+MAX_TOKENS  = 300
 RANDOM_SEED = 4150  # reproducibility — matches survey seed
 
-random.seed(RANDOM_SEED)
+MAX_CONCURRENCY = 6     # parallel in-flight API calls
+RATE_LIMIT_RPS  = 2.0   # token-bucket refill rate (calls per second)
+MAX_RETRIES     = 3     # re-asks after an API error or invalid reply
+RETRY_BACKOFF_S = 1.0   # first retry delay; doubles on each further attempt
+
+CACHE_DIR          = os.path.join(os.path.dirname(__file__), "..", "..", "data", "simulation", "cache")
+CACHE_MAX_BYTES    = 50 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 30
+
+JOURNAL_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "simulation", "journal")
+OUTPUT_DIR  = os.path.join(os.path.dirname(__file__), "..", "..", "data", "simulation")
 
 # ── Agent Type Definitions (calibrated from Section 2.2.4 survey data) ───────
+# `count` is the calibrated 60-agent sample; `population` is the estimated
+# real-world HK crypto-engaged 18-35 segment size (100,000 total, 45% / 55%).
 
 AGENT_TYPES = {
     "cultural_native": {
@@ -57,6 +91,7 @@ AGENT_TYPES = {
         "initial_stance": -0.25,   # slightly negative toward HashKey culturally
         "degen_score": 0.82,
         "rave_affected_share": 0.18,
+        "population": 45_000,
     },
     "cautious_explorer": {
         "count": 32,
@@ -74,6 +109,7 @@ AGENT_TYPES = {
         "initial_stance": 0.05,    # slightly positive but uncommitted
         "degen_score": 0.41,
         "rave_affected_share": 0.12,
+        "population": 55_000,
     },
 }
 
@@ -118,6 +154,18 @@ SCENARIOS = {
     },
 }
 
+# Applied when an agent-type evaluation fails
+FALLBACK_REACTION = {
+    "rib_submission_probability": 0.05,
+    "confession_probability": 0.04,
+    "tg_join_probability": 0.06,
+    "ugc_share_probability": 0.08,
+    "kyc_conversion_probability": 0.03,
+    "stance_change": 0.0,
+    "engagement_depth": 1,
+    "reasoning": "fallback"
+}
+
 # ── Campaign Stimuli (per round) ──────────────────────────────────────────────
 
 STIMULI = [
@@ -166,13 +214,25 @@ def get_client():
 
 # ── Core Simulation: Agent-Type Reaction Evaluation ──────────────────────────
 
-def evaluate_agent_reaction(client, agent_type_name, agent_type, scenario, stimulus):
-    """
-    Single DeepSeek call: evaluate how this agent type reacts to the stimulus
-    under the given scenario conditions. Returns structured reaction metrics.
-    """
+_REACTION_SPEC = """  "rib_submission_probability": <float 0-1, probability this agent submits a tombstone>,
+  "confession_probability": <float 0-1, probability this agent uses /confess on Telegram>,
+  "tg_join_probability": <float 0-1, probability this agent joins @HashKey0xU>,
+  "ugc_share_probability": <float 0-1, probability this agent shares Persona quiz screenshot>,
+  "kyc_conversion_probability": <float 0-1, probability this agent completes KYC on HashKey>,
+  "stance_change": <float -0.3 to +0.5, change in attitude toward HashKey brand>,
+  "engagement_depth": <int 1-5, how deeply this agent engages with the content>,
+  "reasoning": "<one sentence explaining the dominant factor driving this agent's reaction>\""""
 
-    prompt = f"""You are simulating a Hong Kong crypto community member's reaction
+# run instrumentation → metrics.json: per-call latency / tokens / retries,
+# where each reaction came from, and wall time per phase
+CALL_STATS       = CallStats()
+REACTION_SOURCES = Counter()
+PHASES           = PhaseTimer()
+
+
+def build_prompt(agent_type, scenario, stimulus):
+    """Render the reaction prompt for one agent type / scenario / stimulus."""
+    return f"""You are simulating a Hong Kong crypto community member's reaction
 to a marketing campaign stimulus. Respond ONLY with a valid JSON object.
 
 AGENT PROFILE:
@@ -188,74 +248,417 @@ CAMPAIGN STIMULUS THIS ROUND:
 
 Evaluate this agent's reaction. Return ONLY this JSON structure with no markdown:
 {{
-  "rib_submission_probability": <float 0-1, probability this agent submits a tombstone>,
-  "confession_probability": <float 0-1, probability this agent uses /confess on Telegram>,
-  "tg_join_probability": <float 0-1, probability this agent joins @HashKey0xU>,
-  "ugc_share_probability": <float 0-1, probability this agent shares Persona quiz screenshot>,
-  "kyc_conversion_probability": <float 0-1, probability this agent completes KYC on HashKey>,
-  "stance_change": <float -0.3 to +0.5, change in attitude toward HashKey brand>,
-  "engagement_depth": <int 1-5, how deeply this agent engages with the content>,
-  "reasoning": "<one sentence explaining the dominant factor driving this agent's reaction>"
+{_REACTION_SPEC}
 }}"""
 
+
+def build_batch_prompt(type_names, scenario, stimulus):
+    """Render one prompt asking for the reactions of several agent types at once."""
+    profiles = "\n\n".join(
+        f"AGENT TYPE: {name}\n{AGENT_TYPES[name]['description']}" for name in type_names
+    )
+    return f"""You are simulating how several Hong Kong crypto community segments react
+to a marketing campaign stimulus. Respond ONLY with a valid JSON array.
+
+{profiles}
+
+SCENARIO CONTEXT:
+{scenario['description']}
+RAVE crash salience level: {scenario['rave_salience']} (0=forgotten, 1=top of mind)
+RIB tombstone submissions so far: {scenario['rib_seed_72h']}
+
+CAMPAIGN STIMULUS THIS ROUND:
+{stimulus['description']}
+
+Evaluate each agent type's reaction independently. Return ONLY a JSON array with
+exactly one object per agent type above ({", ".join(type_names)}), no markdown:
+[
+  {{
+  "agent_type": "<agent type name exactly as given>",
+{_REACTION_SPEC}
+  }}
+]"""
+
+
+def _request_json(client, prompt, max_tokens, mode, stream=False, opener="{",
+                  validate=validate_reaction):
+    """
+    One chat completion, extracted to JSON and passed through `validate`. With
+    `stream`, tokens are scanned as they arrive and the stream is closed as soon
+    as the JSON value is complete. API errors and invalid replies are retried up
+    to MAX_RETRIES times with exponential backoff; the last error is re-raised.
+    Latency and tokens are recorded in CALL_STATS across all attempts; streamed
+    calls request usage in the final chunk, and when it never arrives (the stream
+    was closed early) the call's tokens are recorded as unknown, not 0.
+    """
+    start, tokens = time.perf_counter(), [0, 0]
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(RETRY_BACKOFF_S * 2 ** (attempt - 1))
+        try:
+            response = client.chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=TEMPERATURE,
+                max_tokens=max_tokens,
+                stream=stream,
+                **({"stream_options": {"include_usage": True}} if stream else {}),
+            )
+            if stream:
+                extractor, usage = JsonExtractor(opener), None
+                try:
+                    for chunk in response:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if chunk.choices and extractor.feed(chunk.choices[0].delta.content or ""):
+                            break   # value complete — don't wait for the trailing tokens
+                finally:
+                    response.close()
+                raw = extractor.result or ""
+            else:
+                usage, raw = response.usage, response.choices[0].message.content
+            if usage is None:
+                tokens = [None, None]
+            elif tokens[0] is not None:
+                tokens[0] += getattr(usage, "prompt_tokens", 0) or 0
+                tokens[1] += getattr(usage, "completion_tokens", 0) or 0
+            result = validate(extract_json(raw, opener))
+            CALL_STATS.record(mode, time.perf_counter() - start, *tokens, attempts=attempt + 1)
+            return result
+        except InvalidReaction as e:
+            CALL_STATS.count(mode, "invalid")
+            error = e
+        except Exception as e:
+            error = e
+    CALL_STATS.record(mode, time.perf_counter() - start, *tokens,
+                      attempts=MAX_RETRIES + 1, ok=False)
+    raise error
+
+
+def evaluate_agent_reaction(client, agent_type_name, agent_type, scenario, stimulus,
+                            stream=False):
+    """
+    Single DeepSeek call: evaluate how this agent type reacts to the stimulus
+    under the given scenario conditions. Returns the validated, range-clamped
+    reaction metrics, or None once every retry has failed.
+    """
+    prompt = build_prompt(agent_type, scenario, stimulus)
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.4,
-            max_tokens=300,
-        )
-        raw = response.choices[0].message.content.strip()
-        # strip markdown code fences if present
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-        return json.loads(raw)
+        return _request_json(client, prompt, MAX_TOKENS, "per_type", stream)
     except Exception as e:
         print(f"  API error ({agent_type_name}, round {stimulus['round']}): {e}")
         return None
 
+
+def _require_list(items):
+    if not isinstance(items, list):
+        raise InvalidReaction(f"expected a JSON array, got {type(items).__name__}")
+    return items
+
+
+def parse_batch_reactions(items, type_names):
+    """
+    Validate a batched JSON-array response. Returns {agent_type: reaction} with
+    None for every type whose entry is missing, duplicated or malformed.
+    """
+    parsed = dict.fromkeys(type_names)
+    entries = {}
+    for item in items:
+        if isinstance(item, dict) and item.get("agent_type") in parsed:
+            entries.setdefault(item["agent_type"], []).append(item)
+    for name, found in entries.items():
+        if len(found) == 1:
+            try:
+                parsed[name] = validate_reaction(found[0])
+            except InvalidReaction:
+                CALL_STATS.count("batched", "invalid")
+    return parsed
+
+
+def evaluate_round_batch(client, type_names, scenario, stimulus, stream=False):
+    """
+    Single DeepSeek call for all `type_names` in one round. Returns
+    {agent_type: reaction or None}; None entries are left for per-type fallback.
+    """
+    prompt = build_batch_prompt(type_names, scenario, stimulus)
+    try:
+        items = _request_json(client, prompt, MAX_TOKENS * len(type_names), "batched",
+                              stream, opener="[", validate=_require_list)
+    except Exception as e:
+        print(f"  API error (batch, round {stimulus['round']}): {e}")
+        items = []
+    return parse_batch_reactions(items, type_names)
+
+# ── Reaction Backends ─────────────────────────────────────────────────────────
+# A backend answers `react` (one agent type) and `react_batch` (several types,
+# one round). Remote backends go through the cache and the rate-limited pool;
+# local ones are evaluated inline.
+
+class DeepSeekBackend:
+    name, remote = "deepseek", True
+
+    def __init__(self, client):
+        self.client = client
+        self.model = MODEL
+
+    def react(self, agent_type_name, agent_type, scenario, stimulus, stream=False):
+        return evaluate_agent_reaction(self.client, agent_type_name, agent_type, scenario,
+                                       stimulus, stream)
+
+    def react_batch(self, type_names, scenario, stimulus, stream=False):
+        return evaluate_round_batch(self.client, type_names, scenario, stimulus, stream)
+
+
+class LocalBackend:
+    """Deterministic parametric model (local_backend.py) — no network, microseconds per call."""
+    name, remote = "local", False
+    model = "local-parametric"
+
+    def react(self, agent_type_name, agent_type, scenario, stimulus, stream=False):
+        return validate_reaction(parametric_reaction(agent_type, scenario, stimulus))
+
+    def react_batch(self, type_names, scenario, stimulus, stream=False):
+        return {name: self.react(name, AGENT_TYPES[name], scenario, stimulus)
+                for name in type_names}
+
+
+BACKENDS = ("deepseek", "local")
+
+
+def get_backend(name):
+    if name == "local":
+        return LocalBackend()
+    return DeepSeekBackend(get_client())
+
+
+def _react(backend, *args):
+    return backend.react(*args)
+
+
+def _react_batch(backend, *args):
+    return backend.react_batch(*args)
+
+# ── Parallel Reaction Fetch ───────────────────────────────────────────────────
+
+def reaction_key(agent_type, scenario, stimulus, batched=False):
+    # batched answers are cached apart from single-type ones: same per-type
+    # granularity, but never mixed into a per-type replay
+    prompt = build_prompt(agent_type, scenario, stimulus)
+    return cache_key(MODEL, TEMPERATURE, MAX_TOKENS, "batched\n" + prompt if batched else prompt)
+
+
+def _batch_jobs(jobs, backend):
+    """
+    Group pending per-type jobs that share a scenario context and stimulus into
+    one batched call each. Returns ({group: args}, {group: {agent_type: key}}).
+    """
+    batches, members = {}, {}
+    for key, (_, atype_name, _, scenario, stimulus, stream) in jobs.items():
+        group = (scenario["description"], scenario["rave_salience"],
+                 scenario["rib_seed_72h"], stimulus["round"])
+        if group not in batches:
+            batches[group] = [backend, [], scenario, stimulus, stream]
+            members[group] = {}
+        batches[group][1].append(atype_name)
+        members[group][atype_name] = key
+    return {g: tuple(args) for g, args in batches.items()}, members
+
+
+def fetch_reactions(backend, scenarios, cache=None, known=None, on_reaction=None,
+                    max_workers=MAX_CONCURRENCY, rate=RATE_LIMIT_RPS, batched=False,
+                    stream=False):
+    """
+    Evaluate every (scenario, round, agent type) reaction concurrently.
+    Prompts depend only on the scenario and stimulus — never on agent state —
+    so all calls are independent, and identical prompts are evaluated once.
+    Cached reactions are resolved before the rate-limited pool; only misses
+    reach the API. `known` ({(scenario, round, agent_type): reaction}, e.g.
+    from a run journal) is taken as already evaluated; `on_reaction(scenario,
+    round, agent_type, reaction)` fires for every newly resolved reaction as
+    soon as it is available. With `batched`, all agent types of one round share
+    a single call; types missing or malformed in the batched reply fall back to
+    per-type calls. `stream` reads each reply incrementally and stops at the
+    end of its JSON value. A local (non-remote) backend bypasses the cache and
+    the pool. Returns
+    {scenario: {round: {agent_type: reaction}}} with None for failed calls.
+    """
+    known = known or {}
+    if backend is not None and not backend.remote:
+        cache = None
+    reactions = {sc_name: {s["round"]: {} for s in STIMULI} for sc_name in scenarios}
+
+    # identical prompt renderings (e.g. scenarios differing only in KOL reach)
+    # share one evaluation
+    targets, jobs, sources = {}, {}, {}
+    for sc_name, scenario in scenarios.items():
+        for stimulus in STIMULI:
+            for atype_name, atype in AGENT_TYPES.items():
+                triple = (sc_name, stimulus["round"], atype_name)
+                if triple in known:
+                    reactions[sc_name][stimulus["round"]][atype_name] = known[triple]
+                    REACTION_SOURCES["journal"] += 1
+                    continue
+                key = reaction_key(atype, scenario, stimulus, batched)
+                if key not in targets:
+                    targets[key] = []
+                    jobs[key] = (backend, atype_name, atype, scenario, stimulus, stream)
+                targets[key].append((sc_name, stimulus["round"], atype_name))
+
+    def _resolved(key, reaction, fresh):
+        results[key] = reaction
+        sources[key] = ("failed" if reaction is None else "cache" if not fresh
+                        else "api" if backend.remote else "local")
+        if reaction is None:
+            return
+        if cache and fresh:
+            sc_name, rnd, atype_name = targets[key][0]
+            cache.put(key, reaction, model=MODEL, scenario=sc_name, round=rnd,
+                      agent_type=atype_name, batched=batched)
+        if on_reaction:
+            for triple in targets[key]:
+                on_reaction(*triple, reaction)
+
+    results = {}
+    if cache:
+        for key in list(jobs):
+            cached = cache.get(key)
+            if cached is not None:
+                try:
+                    _resolved(key, validate_reaction(cached), fresh=False)
+                    del jobs[key]
+                except InvalidReaction:
+                    pass   # pre-validation entry that fails the schema — re-ask
+        print(f"\nReaction cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    if jobs and backend is None:
+        raise RuntimeError(f"{len(jobs)} reaction(s) not cached and no API client available")
+
+    if jobs and not backend.remote:
+        for key, args in jobs.items():
+            _resolved(key, _react(*args), fresh=True)
+        jobs = {}
+
+    if jobs and batched:
+        batches, members = _batch_jobs(jobs, backend)
+        print(f"\nEvaluating {len(jobs)} distinct agent reactions in {len(batches)} "
+              f"batched call(s) (concurrency={max_workers}, rate={rate}/s)...")
+
+        def _batch_resolved(group, parsed):
+            for atype_name, reaction in (parsed or {}).items():
+                if reaction is not None:
+                    key = members[group][atype_name]
+                    _resolved(key, reaction, fresh=True)
+                    del jobs[key]
+
+        evaluate_concurrently(batches, _react_batch, max_workers=max_workers,
+                              rate=rate, on_result=_batch_resolved)
+        if jobs:
+            print(f"  {len(jobs)} reaction(s) missing from batched replies "
+                  "— retrying per agent type")
+
+    if jobs:
+        if not batched:
+            print(f"\nEvaluating {len(jobs)} distinct agent reactions "
+                  f"(concurrency={max_workers}, rate={rate}/s)...")
+        evaluate_concurrently(jobs, _react, max_workers=max_workers,
+                              rate=rate, on_result=lambda k, r: _resolved(k, r, fresh=True))
+
+    for key, reaction in results.items():
+        REACTION_SOURCES[sources[key]] += len(targets[key])
+        for sc_name, rnd, atype_name in targets[key]:
+            reactions[sc_name][rnd][atype_name] = reaction
+    return reactions
+
+
+def missing_reactions(scenarios, cache, batched=False):
+    """List (scenario, round, agent type) triples with no cached reaction."""
+    missing, seen = [], {}
+    for sc_name, scenario in scenarios.items():
+        for stimulus in STIMULI:
+            for atype_name, atype in AGENT_TYPES.items():
+                key = reaction_key(atype, scenario, stimulus, batched)
+                if key not in seen:
+                    seen[key] = key in cache
+                if not seen[key]:
+                    missing.append((sc_name, stimulus["round"], atype_name))
+    return missing
+
+
+def run_batch_benchmark(backend, scenario_name="base", max_workers=MAX_CONCURRENCY,
+                        rate=RATE_LIMIT_RPS):
+    """
+    Fetch every round of one scenario uncached, once per-type and once batched,
+    and compare API calls, wall time and token usage. Returns {mode: stats}.
+    Replies are never streamed here: a stream closed early reports no usage,
+    which would leave the token comparison empty.
+    """
+    scenarios = {scenario_name: SCENARIOS[scenario_name]}
+    report = {}
+    for mode, batched in (("per_type", False), ("batched", True)):
+        CALL_STATS.reset()
+        start = time.perf_counter()
+        fetch_reactions(backend, scenarios, max_workers=max_workers, rate=rate,
+                        batched=batched)
+        wall = time.perf_counter() - start
+        stats = CALL_STATS.summary()
+        calls = sum(m["calls"] for m in stats.values())
+        report[mode] = {
+            "calls": calls,
+            "wall_s": wall,
+            "mean_latency_s": sum(m["latency_s"] for m in stats.values()) / max(calls, 1),
+            # None when a reply reported no usage
+            "prompt_tokens": _total(m["prompt_tokens"] for m in stats.values()),
+            "completion_tokens": _total(m["completion_tokens"] for m in stats.values()),
+        }
+
+    per_type, batch = report["per_type"], report["batched"]
+    print(f"\n── BATCH BENCHMARK ({SCENARIOS[scenario_name]['label']}, {len(STIMULI)} rounds) ──")
+    print(f"  {'':<20} {'per-type':>10} {'batched':>10} {'saving':>8}")
+    for label, field, fmt in (("API calls", "calls", "d"), ("Wall time (s)", "wall_s", ".2f"),
+                              ("Mean latency (s)", "mean_latency_s", ".2f"),
+                              ("Prompt tokens", "prompt_tokens", "d"),
+                              ("Completion tokens", "completion_tokens", "d")):
+        a, b = per_type[field], batch[field]
+        if a is None or b is None:
+            a, b = ("unknown" if v is None else f"{v:{fmt}}" for v in (a, b))
+            print(f"  {label:<20} {a:>10} {b:>10} {'—':>8}")
+            continue
+        saving = f"{1 - b / a:.0%}" if a else "—"
+        print(f"  {label:<20} {a:>10{fmt}} {b:>10{fmt}} {saving:>8}")
+    return report
+
+
+def _total(values):
+    values = list(values)
+    return None if None in values else sum(values)
+
 # ── Simulation Runner ─────────────────────────────────────────────────────────
 
-def run_scenario(client, scenario_name, scenario):
+def run_scenario(scenario_name, scenario, reactions, population_size=None, journal=None):
     print(f"\n{'='*60}")
     print(f"  SCENARIO: {scenario['label'].upper()}")
     print(f"{'='*60}")
 
-    # initialise per-agent state
-    agents = []
-    for atype_name, atype in AGENT_TYPES.items():
-        for i in range(atype["count"]):
-            is_rave = random.random() < atype["rave_affected_share"]
-            agents.append({
-                "id": f"{atype_name}_{i}",
-                "type": atype_name,
-                "stance": atype["initial_stance"] + random.gauss(0, 0.08),
-                "rave_affected": is_rave,
-                "rib_submitted": False,
-                "confessed": False,
-                "tg_joined": False,
-                "ugc_shared": False,
-                "kyc_completed": False,
-                "engagement_total": 0,
-            })
-
-    round_logs = []
+    restored = journal.restore(scenario_name) if journal else None
+    if restored:
+        # continue from the last journaled round with the exact saved RNG state
+        done_round, round_logs, population, rng = restored
+        print(f"\n  Resumed from journal after round {done_round}")
+    else:
+        # one independent generator per scenario → order-free and reproducible
+        done_round, round_logs = 0, []
+        rng = make_rng(RANDOM_SEED, list(SCENARIOS).index(scenario_name))
+        counts = allocate_counts(AGENT_TYPES, population_size)
+        with PHASES.phase("agent_init"):
+            population = AgentPopulation.initialise(AGENT_TYPES, rng, counts)
 
     for stimulus in STIMULI:
+        if stimulus["round"] <= done_round:
+            continue
         print(f"\n  Round {stimulus['round']}: {stimulus['name']}")
-        round_reactions = {}
+        round_reactions, fallbacks = {}, []
 
         for atype_name in AGENT_TYPES:
-            print(f"    Evaluating {atype_name}...", end=" ", flush=True)
-            reaction = evaluate_agent_reaction(
-                client,
-                atype_name,
-                AGENT_TYPES[atype_name],
-                scenario,
-                stimulus
-            )
+            print(f"    {atype_name}:", end=" ")
+            reaction = reactions[stimulus["round"]].get(atype_name)
             if reaction:
                 round_reactions[atype_name] = reaction
                 print(f"stance_change={reaction['stance_change']:+.3f}  "
@@ -264,114 +667,29 @@ def run_scenario(client, scenario_name, scenario):
                 print(f"      → {reaction['reasoning']}")
             else:
                 print("FAILED — using fallback values")
-                round_reactions[atype_name] = {
-                    "rib_submission_probability": 0.05,
-                    "confession_probability": 0.04,
-                    "tg_join_probability": 0.06,
-                    "ugc_share_probability": 0.08,
-                    "kyc_conversion_probability": 0.03,
-                    "stance_change": 0.0,
-                    "engagement_depth": 1,
-                    "reasoning": "fallback"
-                }
-
-            time.sleep(0.5)  # rate limiting
+                round_reactions[atype_name] = dict(FALLBACK_REACTION)
+                fallbacks.append(atype_name)
 
         # apply reactions to individual agents with noise
-        for agent in agents:
-            r = round_reactions[agent["type"]]
-            noise = lambda: random.gauss(0, 0.05)
-            rave_boost = 1.3 if agent["rave_affected"] else 1.0
-
-            if not agent["rib_submitted"] and random.random() < min(1.0, r["rib_submission_probability"] * rave_boost + noise()):
-                agent["rib_submitted"] = True
-            if not agent["confessed"] and random.random() < min(1.0, r["confession_probability"] * rave_boost + noise()):
-                agent["confessed"] = True
-            if not agent["tg_joined"] and random.random() < min(1.0, r["tg_join_probability"] + noise()):
-                agent["tg_joined"] = True
-            if not agent["ugc_shared"] and random.random() < min(1.0, r["ugc_share_probability"] + noise()):
-                agent["ugc_shared"] = True
-            if not agent["kyc_completed"] and random.random() < min(1.0, r["kyc_conversion_probability"] + noise()):
-                agent["kyc_completed"] = True
-
-            stance_delta = r["stance_change"] * rave_boost + random.gauss(0, 0.04)
-            agent["stance"] = max(-1.0, min(1.0, agent["stance"] + stance_delta))
-            agent["engagement_total"] += r["engagement_depth"]
+        with PHASES.phase("update_loop"):
+            population.apply_round(round_reactions, rng)
 
         round_logs.append({
             "round": stimulus["round"],
             "stimulus": stimulus["name"],
             "reactions": round_reactions,
-            "agent_snapshot": {
-                "mean_stance": sum(a["stance"] for a in agents) / len(agents),
-                "rib_submitted_pct": sum(1 for a in agents if a["rib_submitted"]) / len(agents),
-                "tg_joined_pct": sum(1 for a in agents if a["tg_joined"]) / len(agents),
-                "kyc_pct": sum(1 for a in agents if a["kyc_completed"]) / len(agents),
-            }
+            "fallbacks": fallbacks,
+            "agent_snapshot": population.snapshot(),
         })
+        if journal:
+            with PHASES.phase("journal"):
+                journal.record_round(scenario_name, stimulus["round"], round_logs,
+                                     population, rng)
 
     # ── Scale to real-world population ───────────────────────────────────────
-    # Estimated HK crypto-engaged 18-35 population: 100,000
-    # Cultural Natives: 45% = 45,000 | Cautious Explorers: 55% = 55,000
-    POP_TOTAL      = 100_000
-    POP_NATIVE     = 45_000
-    POP_EXPLORER   = 55_000
-
-    final_rates = {
-        atype: {
-            metric: sum(a[metric.replace("_pct", "_submitted") if "rib" in metric
-                       else metric.replace("_pct", "_joined") if "tg" in metric
-                       else metric.replace("_pct", "_completed") if "kyc" in metric
-                       else metric.replace("_pct", "_shared") if "ugc" in metric
-                       else "confessed"] for a in agents if a["type"] == atype) / AGENT_TYPES[atype]["count"]
-            for metric in ["rib_submitted", "confessed", "tg_joined", "ugc_shared", "kyc_completed"]
-        }
-        for atype in AGENT_TYPES
-    }
-
-    tg_members = min(
-        10_000,
-        int((final_rates["cultural_native"]["tg_joined"] * POP_NATIVE +
-             final_rates["cautious_explorer"]["tg_joined"] * POP_EXPLORER)
-            * scenario["kol_reach_multiplier"])
-    )
-    rib_submissions = int(
-        final_rates["cultural_native"]["rib_submitted"] * POP_NATIVE * scenario["kol_reach_multiplier"]
-    )
-    confess_submissions = int(
-        (final_rates["cultural_native"]["confessed"] * POP_NATIVE +
-         final_rates["cautious_explorer"]["confessed"] * POP_EXPLORER * 0.5)
-        * scenario["kol_reach_multiplier"]
-    )
-    kyc_accounts = min(
-        10_001,
-        int((final_rates["cultural_native"]["kyc_completed"] * POP_NATIVE +
-             final_rates["cautious_explorer"]["kyc_completed"] * POP_EXPLORER)
-            * scenario["kol_reach_multiplier"])
-    )
-
-    # gap Δ: baseline 2.52; stance change scaled to 7-pt gap reduction
-    mean_stance_change = (
-        sum(a["stance"] - AGENT_TYPES[a["type"]]["initial_stance"] for a in agents)
-        / len(agents)
-    )
-    predicted_gap = max(1.0, 2.52 - (mean_stance_change * 4.2))
-
-    # boring association: baseline 39.4%
-    positive_agents = sum(1 for a in agents if a["stance"] > 0.1) / len(agents)
-    boring_predicted = max(0.10, 0.394 - (positive_agents * 0.22))
-
-    predicted_metrics = {
-        "tg_members_by_may22":       tg_members,
-        "rib_total_submissions":      rib_submissions,
-        "confess_unique_submissions": confess_submissions,
-        "kyc_airdrop_accounts":       kyc_accounts,
-        "trust_engagement_gap_jul":   round(predicted_gap, 2),
-        "boring_association_jul":     f"{boring_predicted:.1%}",
-        "mean_stance_final":          round(sum(a["stance"] for a in agents) / len(agents), 4),
-        "mean_stance_change":         round(mean_stance_change, 4),
-        "pct_positive_stance":        f"{positive_agents:.1%}",
-    }
+    with PHASES.phase("scaling"):
+        kpis = predict_kpis(population, AGENT_TYPES, scenario)
+    predicted_metrics = format_metrics(kpis)
 
     print(f"\n  ── PREDICTED METRICS ({scenario['label']}) ──")
     for k, v in predicted_metrics.items():
@@ -381,32 +699,158 @@ def run_scenario(client, scenario_name, scenario):
         "scenario": scenario_name,
         "label": scenario["label"],
         "round_logs": round_logs,
-        "final_rates_sample": final_rates,
+        "final_rates_sample": population.type_rates(),
         "predicted_metrics": predicted_metrics,
-        "agent_count": len(agents),
+        "agent_count": len(population),
+        "fallback_reactions": sum(len(rl["fallbacks"]) for rl in round_logs),
         "timestamp": datetime.now().isoformat(),
     }
 
+
+def format_metrics(kpis):
+    """Round / percent-format numeric KPIs for results.json and the summary table."""
+    return {
+        "tg_members_by_may22":        kpis["tg_members_by_may22"],
+        "rib_total_submissions":      kpis["rib_total_submissions"],
+        "confess_unique_submissions": kpis["confess_unique_submissions"],
+        "kyc_airdrop_accounts":       kpis["kyc_airdrop_accounts"],
+        "trust_engagement_gap_jul":   round(kpis["trust_engagement_gap_jul"], 2),
+        "boring_association_jul":     f"{kpis['boring_association_jul']:.1%}",
+        "mean_stance_final":          round(kpis["mean_stance_final"], 4),
+        "mean_stance_change":         round(kpis["mean_stance_change"], 4),
+        "pct_positive_stance":        f"{kpis['pct_positive_stance']:.1%}",
+    }
+
 # ── Entry Point ───────────────────────────────────────────────────────────────
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Re-coding Trust campaign simulation (Section 6)")
+    parser.add_argument("--backend", choices=BACKENDS, default="deepseek",
+                        help="reaction source: DeepSeek API or the offline parametric model")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help="maximum parallel API calls")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_RPS,
+                        help="sustained API calls per second (token bucket)")
+    parser.add_argument("--cache-only", action="store_true",
+                        help="rebuild results from the reaction cache with no network access")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the reaction cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="reaction cache directory")
+    parser.add_argument("--population", type=int, default=None,
+                        help="simulate N agents split by real-world segment share "
+                             "(default: calibrated 60-agent sample)")
+    parser.add_argument("--replicates", type=int, default=0,
+                        help="Monte Carlo replicates per scenario for percentile bands (0 = off)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for the ensemble (default: all cores)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="discard any interrupted-run journal instead of resuming it")
+    parser.add_argument("--batched", action="store_true",
+                        help="evaluate all agent types of a round in one API call")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream replies and stop reading once the JSON is complete")
+    parser.add_argument("--batch-benchmark", action="store_true",
+                        help="compare per-type vs batched calls on the base scenario and exit")
+    parser.add_argument("--out-dir", default=None,
+                        help="where to write results.json / summary.txt / metrics.json "
+                             "(default: data/simulation, or data/simulation/<backend> "
+                             "for non-DeepSeek backends)")
+    args = parser.parse_args(argv)
+    if args.out_dir is None:
+        args.out_dir = OUTPUT_DIR if args.backend == "deepseek" else os.path.join(OUTPUT_DIR, args.backend)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
     print("=" * 60)
     print("  Re-coding Trust — Campaign Simulation (Section 6)")
     print("  COMM4150 FYP | ZHAO Han (1155191400)")
-    print(f"  Model: {MODEL} | Agents: 60 | Scenarios: 3")
+    n_agents = sum(allocate_counts(AGENT_TYPES, args.population).values())
+    model = LocalBackend.model if args.backend == "local" else MODEL
+    print(f"  Model: {model} | Agents: {n_agents:,} | Scenarios: {len(SCENARIOS)}")
     print("=" * 60)
 
-    client = get_client()
-    all_results = {}
+    if args.batch_benchmark:
+        if args.stream:
+            print("ERROR: --batch-benchmark compares token usage, which streamed replies "
+                  "closed early do not report; drop --stream.")
+            sys.exit(1)
+        run_batch_benchmark(get_backend(args.backend), max_workers=args.concurrency,
+                            rate=args.rate)
+        return
+
+    if args.backend == "local" and args.cache_only:
+        print("ERROR: --cache-only replays DeepSeek reactions; the local backend needs no cache.")
+        sys.exit(1)
 
+    cache = None
+    if not args.no_cache and args.backend != "local":
+        cache = ReactionCache(args.cache_dir, max_bytes=CACHE_MAX_BYTES,
+                              max_age_days=CACHE_MAX_AGE_DAYS)
+        cache.prune()
+
+    # append-only journal: completed reactions + per-round state, for crash resume
+    journal = RunJournal(JOURNAL_DIR, run_fingerprint(
+        seed=RANDOM_SEED, model=model, temperature=TEMPERATURE, max_tokens=MAX_TOKENS,
+        population=args.population, batched=args.batched, agent_types=AGENT_TYPES,
+        scenarios=SCENARIOS, stimuli=STIMULI))
+    if args.fresh:
+        journal.clear()
+        journal = RunJournal(JOURNAL_DIR, journal.fingerprint)
+    elif journal.resumable:
+        print(f"Resuming interrupted run: {len(journal.reactions)} reaction(s), "
+              f"{len(journal.rounds)} scenario(s) with completed rounds in journal")
+
+    if args.cache_only:
+        if cache is None:
+            print("ERROR: --cache-only cannot be combined with --no-cache.")
+            sys.exit(1)
+        missing = [t for t in missing_reactions(SCENARIOS, cache, args.batched)
+                   if t not in journal.reactions]
+        if missing:
+            print(f"ERROR: {len(missing)} reaction(s) missing from cache, e.g. {missing[0]}. "
+                  "Run once with network access first.")
+            sys.exit(1)
+        backend = None
+    else:
+        backend = get_backend(args.backend)
+
+    with PHASES.phase("reaction_fetch"):
+        reactions = fetch_reactions(backend, SCENARIOS, cache=cache, known=journal.reactions,
+                                    on_reaction=journal.record_reaction,
+                                    max_workers=args.concurrency, rate=args.rate,
+                                    batched=args.batched, stream=args.stream)
+    for mode, m in CALL_STATS.summary().items():
+        tokens = ("unknown tokens (usage not reported)" if m["prompt_tokens"] is None else
+                  f"{m['prompt_tokens']:,} prompt + {m['completion_tokens']:,} completion tokens")
+        print(f"  {mode}: {m['calls']} call(s), {tokens}, {m['retries']} retried, "
+              f"{m.get('invalid', 0)} invalid")
+
+    # each scenario draws from its own seeded generator → deterministic for RANDOM_SEED
+    all_results = {}
     for scenario_name, scenario in SCENARIOS.items():
-        result = run_scenario(client, scenario_name, scenario)
+        result = run_scenario(scenario_name, scenario, reactions[scenario_name],
+                              population_size=args.population, journal=journal)
         all_results[scenario_name] = result
 
+    # ── Monte Carlo ensemble: same reactions, re-drawn agent noise ────────────
+    if args.replicates > 0:
+        counts = allocate_counts(AGENT_TYPES, args.population)
+        for idx, (scenario_name, scenario) in enumerate(SCENARIOS.items()):
+            print(f"\nEnsemble: {scenario['label']} × {args.replicates} replicates...")
+            round_reactions = [rl["reactions"] for rl in all_results[scenario_name]["round_logs"]]
+            with PHASES.phase("ensemble"):
+                samples = run_ensemble(AGENT_TYPES, scenario, idx, round_reactions, counts,
+                                       RANDOM_SEED, args.replicates, workers=args.workers)
+            all_results[scenario_name]["ensemble"] = {
+                "replicates": args.replicates,
+                "percentiles": summarise(samples),
+            }
+
     # ── Save results ──────────────────────────────────────────────────────────
-    out_dir = os.path.join(
-        os.path.dirname(__file__), "..", "..", "data", "simulation"
-    )
+    out_dir = args.out_dir
     os.makedirs(out_dir, exist_ok=True)
 
     json_path = os.path.join(out_dir, "results.json")
@@ -435,9 +879,26 @@ def main():
         vals = [str(all_results[s]["predicted_metrics"][key]) for s in SCENARIOS]
         summary_lines.append(f"{label:<42} {vals[0]:>10} {vals[1]:>10} {vals[2]:>10}")
 
+    if args.replicates > 0:
+        summary_lines += [
+            "-" * 72,
+            f"MONTE CARLO BANDS — {args.replicates} replicates/scenario (p5 / p50 / p95)",
+            "-" * 72,
+        ]
+        band_formats = {"trust_engagement_gap_jul": ".2f", "boring_association_jul": ".1%"}
+        for label, key in metrics_display:
+            fmt = band_formats.get(key, ",.0f")
+            for s in SCENARIOS:
+                b = all_results[s]["ensemble"]["percentiles"][key]
+                summary_lines.append(f"{label:<32} {SCENARIOS[s]['label']:<11} "
+                                     f"{b['p5']:>9{fmt}} {b['p50']:>9{fmt}} {b['p95']:>9{fmt}}")
+
+    fallbacks = [all_results[s]["fallback_reactions"] for s in SCENARIOS]
     summary_lines += [
         "-" * 72,
-        f"Simulation seed: {RANDOM_SEED} | Model: {MODEL}",
+        f"{'Fallback reactions (failed calls)':<42} {fallbacks[0]:>10} {fallbacks[1]:>10} "
+        f"{fallbacks[2]:>10}",
+        f"Simulation seed: {RANDOM_SEED} | Model: {model}",
         f"Run timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
         "=" * 72,
     ]
@@ -449,6 +910,20 @@ def main():
         f.write(summary)
     print(f"✓ Summary saved → {summary_path}")
 
+    metrics = build_metrics(CALL_STATS, PHASES, REACTION_SOURCES, run_info={
+        "timestamp": datetime.now().isoformat(), "backend": args.backend, "model": model,
+        "agents": n_agents, "batched": args.batched, "stream": args.stream,
+        "concurrency": args.concurrency, "rate": args.rate, "replicates": args.replicates,
+    })
+    metrics_path = os.path.join(out_dir, "metrics.json")
+    write_metrics(metrics_path, metrics)
+    api = metrics["api"]
+    cost = "unknown" if api["est_cost_usd"] is None else f"${api['est_cost_usd']:.4f}"
+    print(f"✓ Metrics saved → {metrics_path}  (API p95 latency: "
+          f"{api['latency_s']['p95'] or 0:.2f}s, est. cost {cost})")
+
+    journal.clear()   # run complete — nothing left to resume
+
 
 if __name__ == "__main__":
     main()
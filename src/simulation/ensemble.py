@@ -0,0 +1,71 @@
+"""
+Monte Carlo Ensemble — Section 6 simulation
+===========================================
+Re-runs the stochastic agent-update step of campaign_sim.py many times against
+the same per-round LLM reactions, turning each scenario's single point estimate
+into percentile bands.
+
+The reactions are fetched once; every replicate only re-draws agent noise from
+its own generator make_rng(seed, scenario_idx, replicate + 1) — replicate
+streams never collide with the point-estimate stream make_rng(seed, scenario_idx).
+Replicates are pure CPU work, so they are farmed out in chunks to a process pool
+and scale with core count.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from population import AgentPopulation, make_rng, predict_kpis
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _run_chunk(task):
+    agent_types, scenario, scenario_idx, round_reactions, counts, seed, replicates = task
+    rows = []
+    for rep in replicates:
+        rng = make_rng(seed, scenario_idx, rep + 1)
+        population = AgentPopulation.initialise(agent_types, rng, counts)
+        for reactions in round_reactions:
+            population.apply_round(reactions, rng)
+        rows.append(predict_kpis(population, agent_types, scenario))
+    return rows
+
+
+def run_ensemble(agent_types, scenario, scenario_idx, round_reactions, counts,
+                 seed, n_replicates, workers=None):
+    """
+    Run `n_replicates` seeded replicates of one scenario.
+    `round_reactions` is the ordered list of per-round {agent_type: reaction}.
+    Returns {metric: np.ndarray of length n_replicates}, in replicate order.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_chunks = max(1, min(n_replicates, workers * 4))
+    chunks = [c.tolist() for c in np.array_split(np.arange(n_replicates), n_chunks)]
+    tasks = [(agent_types, scenario, scenario_idx, round_reactions, counts, seed, c)
+             for c in chunks if c]
+
+    if workers == 1:
+        results = map(_run_chunk, tasks)
+        rows = [row for chunk in results for row in chunk]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = [row for chunk in pool.map(_run_chunk, tasks) for row in chunk]
+
+    return {metric: np.array([row[metric] for row in rows], dtype=float)
+            for metric in rows[0]}
+
+
+def summarise(samples, percentiles=PERCENTILES):
+    """{metric: {"mean", "std", "p5", ...}} from run_ensemble output."""
+    summary = {}
+    for metric, values in samples.items():
+        bands = np.percentile(values, percentiles)
+        summary[metric] = {
+            "mean": round(float(values.mean()), 4),
+            "std":  round(float(values.std(ddof=1)) if len(values) > 1 else 0.0, 4),
+            **{f"p{p}": round(float(v), 4) for p, v in zip(percentiles, bands)},
+        }
+    return summary
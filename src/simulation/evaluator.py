@@ -0,0 +1,142 @@
+"""
+Concurrent Reaction Evaluator — Section 6 simulation
+=====================================================
+Runs the DeepSeek agent-reaction calls of campaign_sim.py on a bounded thread
+pool. Throughput is governed by a token-bucket rate limiter rather than a fixed
+sleep between calls, so independent (scenario, round, agent type) evaluations
+overlap their network wait.
+
+Results are returned keyed by job, never in completion order, so the stochastic
+agent-update step that consumes them stays deterministic for a given seed.
+
+Point DEEPSEEK_BASE_URL at a local OpenAI-compatible stub to exercise the pool
+without network access.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1.0):
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CallStats:
+    """
+    Thread-safe tally of API calls. Each logical call (one reaction or one batch,
+    including its retries) is kept as a record for percentile summaries; totals
+    are aggregated per mode ("per_type", "batched"). A call whose reply carried
+    no usage (e.g. a stream closed before its final chunk) records its tokens
+    as None, and once a mode has such a call its token totals are None too:
+    unknown, not zero.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_mode = {}
+        self.calls = []
+
+    def reset(self):
+        with self._lock:
+            self.by_mode = {}
+            self.calls = []
+
+    def record(self, mode, latency, prompt_tokens=0, completion_tokens=0, attempts=1, ok=True):
+        with self._lock:
+            m = self._mode(mode)
+            m["calls"] += attempts
+            m["latency_s"] += latency
+            if prompt_tokens is None or completion_tokens is None:
+                prompt_tokens = completion_tokens = None
+                m["usage_unknown"] += 1
+                m["prompt_tokens"] = m["completion_tokens"] = None
+            elif not m["usage_unknown"]:
+                m["prompt_tokens"] += prompt_tokens
+                m["completion_tokens"] += completion_tokens
+            m["retries"] += attempts - 1
+            m["failed"] += not ok
+            self.calls.append({"mode": mode, "latency_s": latency,
+                               "prompt_tokens": prompt_tokens,
+                               "completion_tokens": completion_tokens,
+                               "retries": attempts - 1, "ok": ok})
+
+    def count(self, mode, counter, n=1):
+        """Bump a named event counter, e.g. "invalid"."""
+        with self._lock:
+            m = self._mode(mode)
+            m[counter] = m.get(counter, 0) + n
+
+    def _mode(self, mode):
+        return self.by_mode.setdefault(mode, {"calls": 0, "latency_s": 0.0,
+                                              "prompt_tokens": 0, "completion_tokens": 0,
+                                              "retries": 0, "failed": 0, "usage_unknown": 0})
+
+    def summary(self):
+        with self._lock:
+            return {mode: dict(m) for mode, m in self.by_mode.items()}
+
+    def records(self):
+        with self._lock:
+            return list(self.calls)
+
+
+def evaluate_concurrently(jobs, evaluate, max_workers=6, rate=2.0, burst=None,
+                          on_result=None):
+    """
+    Run `evaluate(*args)` for every entry of `jobs` ({key: args_tuple}) on a
+    thread pool of `max_workers`, admitting at most `rate` calls per second.
+    `on_result(key, result)` is called from the calling thread as each job
+    finishes. Returns {key: result}; an exception inside `evaluate` yields None.
+    Interrupting (Ctrl-C) cancels every job that has not started yet.
+    """
+    if not jobs:
+        return {}
+    bucket = TokenBucket(rate, burst)
+
+    def _run(args):
+        bucket.acquire()
+        try:
+            return evaluate(*args)
+        except Exception as e:
+            print(f"  Evaluation error: {e}")
+            return None
+
+    workers = max(1, min(max_workers, len(jobs)))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    results = {}
+    try:
+        futures = {pool.submit(_run, args): key for key, args in jobs.items()}
+        for fut in as_completed(futures):
+            key = futures[fut]
+            results[key] = fut.result()
+            if on_result:
+                on_result(key, results[key])
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return {key: results[key] for key in jobs}
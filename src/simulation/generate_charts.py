@@ -2,8 +2,14 @@
 Section 6 — Simulation Visualizations
 Re-coding Trust | COMM4150 FYP | ZHAO Han (1155191400)
 
-Generates 4 publication-quality figures from data/simulation/results.json.
-Output: data/simulation/charts/fig6_1_*.png ... fig6_4_*.png
+Generates 4 publication-quality figures from data/simulation/results.json,
+plus Fig 6.5 (sensitivity surface) when sweep.py output is present.
+Output: data/simulation/charts/fig6_1_*.png ... fig6_5_*.png
+
+Importing the module does no I/O: load_results() reads results.json on
+first use and caches it, and each figure accepts an explicit results object
+(and output directory), so figures can be rendered from a server, a test
+harness or an alternate run without touching data/simulation.
 
 Usage:
     python src/simulation/generate_charts.py
@@ -11,6 +17,7 @@ Usage:
 
 import json
 import os
+from functools import lru_cache
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
@@ -25,8 +32,8 @@ matplotlib.rcParams['axes.spines.right'] = False
 # ── Paths ─────────────────────────────────────────────────────────────────────
 BASE_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
 DATA_PATH = os.path.join(BASE_DIR, 'data', 'simulation', 'results.json')
+SWEEP_PATH = os.path.join(BASE_DIR, 'data', 'simulation', 'sweep', 'sweep_results.npz')
 OUT_DIR   = os.path.join(BASE_DIR, 'data', 'simulation', 'charts')
-os.makedirs(OUT_DIR, exist_ok=True)
 
 # ── Color palette (Safe Punk brand + accessible) ──────────────────────────────
 C_PESSIMISTIC = '#6C757D'   # grey
@@ -39,8 +46,27 @@ BG            = '#FAFAFA'
 GRID          = '#E9ECEF'
 
 # ── Load data ─────────────────────────────────────────────────────────────────
-with open(DATA_PATH, encoding='utf-8') as f:
-    data = json.load(f)
+@lru_cache(maxsize=None)
+def _read_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_results(path=DATA_PATH):
+    """Simulation results from `path`, read on first use and cached per path."""
+    return _read_results(os.path.abspath(path))
+
+
+def clear_cache():
+    """Forget cached results (e.g. after campaign_sim.py rewrote results.json)."""
+    _read_results.cache_clear()
+
+
+def _output(name, out_dir=None):
+    out_dir = out_dir or OUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    return os.path.join(out_dir, name)
+
 
 scenarios   = ['pessimistic', 'base', 'optimistic']
 labels      = ['Pessimistic', 'Base', 'Optimistic']
@@ -49,7 +75,8 @@ colors      = [C_PESSIMISTIC, C_BASE, C_OPTIMISTIC]
 # ─────────────────────────────────────────────────────────────────────────────
 # Fig 6.1 — Agent Stance Evolution Across Rounds
 # ─────────────────────────────────────────────────────────────────────────────
-def fig_6_1():
+def fig_6_1(data=None, out_dir=None):
+    data = load_results() if data is None else data
     fig, ax = plt.subplots(figsize=(9, 5.5), facecolor=BG)
     ax.set_facecolor(BG)
 
@@ -92,16 +119,17 @@ def fig_6_1():
     ax.set_axisbelow(True)
 
     plt.tight_layout()
-    out = os.path.join(OUT_DIR, 'fig6_1_stance_evolution.png')
+    out = _output('fig6_1_stance_evolution.png', out_dir)
     plt.savefig(out, dpi=180, bbox_inches='tight', facecolor=BG)
     plt.close()
     print(f'  Saved: {out}')
+    return out
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Fig 6.2 — KPI Predictions: Three Scenarios
 # ─────────────────────────────────────────────────────────────────────────────
-def fig_6_2():
+def fig_6_2(out_dir=None):
     fig, axes = plt.subplots(1, 2, figsize=(12, 5.5), facecolor=BG)
     fig.suptitle('Fig 6.2 — Campaign KPI Predictions by Scenario',
                  fontsize=12, fontweight='bold', x=0.02, ha='left', y=1.01)
@@ -186,16 +214,17 @@ def fig_6_2():
     ax2.legend(lines1 + lines2, lbls1 + lbls2, fontsize=8, framealpha=0.9, loc='upper right')
 
     plt.tight_layout()
-    out = os.path.join(OUT_DIR, 'fig6_2_kpi_comparison.png')
+    out = _output('fig6_2_kpi_comparison.png', out_dir)
     plt.savefig(out, dpi=180, bbox_inches='tight', facecolor=BG)
     plt.close()
     print(f'  Saved: {out}')
+    return out
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Fig 6.3 — Agent Behaviour Radar: Cultural Native vs Cautious Explorer (Base)
 # ─────────────────────────────────────────────────────────────────────────────
-def fig_6_3():
+def fig_6_3(out_dir=None):
     categories = ['RIB Submission', '/confess', 'TG Joined', 'UGC Shared', 'KYC Completed']
     N = len(categories)
 
@@ -229,21 +258,23 @@ def fig_6_3():
     ax.legend(loc='lower right', bbox_to_anchor=(1.28, -0.08), fontsize=10, framealpha=0.9)
 
     plt.tight_layout()
-    out = os.path.join(OUT_DIR, 'fig6_3_agent_radar.png')
+    out = _output('fig6_3_agent_radar.png', out_dir)
     plt.savefig(out, dpi=180, bbox_inches='tight', facecolor=BG)
     plt.close()
     print(f'  Saved: {out}')
+    return out
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Fig 6.4 — KYC Conversion Probability Through Campaign Funnel
 # ─────────────────────────────────────────────────────────────────────────────
-def fig_6_4():
+def fig_6_4(data=None, out_dir=None):
     """
     Shows how KYC conversion probability rises through the 3 rounds
     for both agent types, across all 3 scenarios.
     Validates Finding 4: KYC is a lagged funnel outcome.
     """
+    data = load_results() if data is None else data
     fig, axes = plt.subplots(1, 2, figsize=(11, 5.5), facecolor=BG,
                              sharey=True)
     fig.suptitle('Fig 6.4 — KYC Conversion Probability Across Campaign Rounds\n'
@@ -288,21 +319,79 @@ def fig_6_4():
                 color=C_TARGET, style='italic')
 
     plt.tight_layout()
-    out = os.path.join(OUT_DIR, 'fig6_4_kyc_funnel.png')
+    out = _output('fig6_4_kyc_funnel.png', out_dir)
     plt.savefig(out, dpi=180, bbox_inches='tight', facecolor=BG)
     plt.close()
     print(f'  Saved: {out}')
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Fig 6.5 — Sensitivity Surface from Parameter Sweep (sweep.py)
+# ─────────────────────────────────────────────────────────────────────────────
+def load_sweep(path=SWEEP_PATH, columns=None):
+    """Columnar sweep results → {column: ndarray}. NPZ members load lazily,
+    so only the requested columns are read."""
+    with np.load(path) as npz:
+        return {k: npz[k] for k in (columns or npz.files)}
+
+
+def _sweep_axis(values, max_levels=10):
+    """Bin index + tick labels: one bin per level for grids, equal-width bins for LHS."""
+    levels = np.unique(values)
+    if len(levels) <= max_levels:
+        return np.searchsorted(levels, values), [f'{v:g}' for v in levels]
+    edges = np.linspace(values.min(), values.max(), max_levels + 1)
+    idx = np.clip(np.digitize(values, edges) - 1, 0, max_levels - 1)
+    return idx, [f'{(a + b) / 2:.2f}' for a, b in zip(edges[:-1], edges[1:])]
+
+
+def fig_6_5(metric='rib_total_submissions', x_knob='rave_salience',
+            y_knob='kol_reach_multiplier', sweep=None, out_dir=None):
+    sw = load_sweep(columns=[x_knob, y_knob, metric]) if sweep is None else sweep
+    xi, xlabels = _sweep_axis(sw[x_knob])
+    yi, ylabels = _sweep_axis(sw[y_knob])
+
+    # mean metric per (x, y) bin, marginalising any other swept knob
+    total = np.zeros((len(ylabels), len(xlabels)))
+    count = np.zeros_like(total)
+    np.add.at(total, (yi, xi), sw[metric])
+    np.add.at(count, (yi, xi), 1)
+    surface = np.divide(total, count, out=np.full_like(total, np.nan), where=count > 0)
+
+    fig, ax = plt.subplots(figsize=(9, 5.5), facecolor=BG)
+    im = ax.imshow(surface, origin='lower', aspect='auto', cmap='magma')
+    cbar = fig.colorbar(im, ax=ax)
+    cbar.set_label(metric.replace('_', ' '), fontsize=9)
+    ax.set_xticks(range(len(xlabels)))
+    ax.set_xticklabels(xlabels, fontsize=8)
+    ax.set_yticks(range(len(ylabels)))
+    ax.set_yticklabels(ylabels, fontsize=8)
+    ax.set_xlabel(x_knob.replace('_', ' '), fontsize=10)
+    ax.set_ylabel(y_knob.replace('_', ' '), fontsize=10)
+    ax.set_title(f'Fig 6.5 — Sensitivity Surface ({len(sw[metric]):,} sweep cells)',
+                 fontsize=12, fontweight='bold', pad=12, loc='left')
+
+    plt.tight_layout()
+    out = _output('fig6_5_sensitivity_surface.png', out_dir)
+    plt.savefig(out, dpi=180, bbox_inches='tight', facecolor=BG)
+    plt.close()
+    print(f'  Saved: {out}')
+    return out
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Main
 # ─────────────────────────────────────────────────────────────────────────────
 if __name__ == '__main__':
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from visualization.render import discover, render_all
+
     print('Generating Section 6 figures...')
-    fig_6_1()
-    fig_6_2()
-    fig_6_3()
-    fig_6_4()
+    # Fig 6.5 only renders when sweep output exists; figures whose results.json
+    # input, code and style are unchanged are reused from the build cache
+    render_all(discover(['generate_charts']))
     print(f'\nAll figures saved to: {OUT_DIR}')
     print('Figures: fig6_1_stance_evolution.png  fig6_2_kpi_comparison.png')
     print('         fig6_3_agent_radar.png        fig6_4_kyc_funnel.png')
@@ -0,0 +1,121 @@
+"""
+Run Journal — Section 6 simulation
+==================================
+Append-only checkpoint log for campaign_sim.py, so a crashed or interrupted
+(Ctrl-C) run resumes exactly where it stopped instead of re-paying for API calls.
+
+Two record kinds are appended to journal.jsonl, each flushed and fsynced:
+    reaction  — a completed (scenario, round, agent_type) LLM reaction
+    round     — a finished simulation round: its round_log, the generator state
+                (bit_generator.state) and a pointer to an NPZ snapshot of the
+                full agent-population arrays in state/
+
+The first line is a header carrying a fingerprint of the run configuration
+(seed, model, population, agent types, scenarios, stimuli). A journal whose
+fingerprint does not match the current run is discarded, never replayed.
+
+Layout:
+    data/simulation/journal/journal.jsonl
+    data/simulation/journal/state/<scenario>_r<round>.npz
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from population import AgentPopulation
+
+
+def run_fingerprint(**config):
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunJournal:
+    def __init__(self, journal_dir, fingerprint):
+        self.journal_dir = journal_dir
+        self.state_dir = os.path.join(journal_dir, "state")
+        self.path = os.path.join(journal_dir, "journal.jsonl")
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self.reactions = {}   # (scenario, round, agent_type) → reaction
+        self.rounds = {}      # scenario → latest round record
+        self._open()
+
+    # ── loading ──────────────────────────────────────────────────────────────
+    def _open(self):
+        records = []
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break   # torn final line from a crash mid-write
+        if not records or records[0].get("fingerprint") != self.fingerprint:
+            if records:
+                print("  Journal belongs to a different run configuration — discarding.")
+            self.clear()
+            os.makedirs(self.state_dir, exist_ok=True)
+            self._append({"kind": "header", "fingerprint": self.fingerprint})
+            return
+
+        for rec in records[1:]:
+            if rec["kind"] == "reaction":
+                self.reactions[(rec["scenario"], rec["round"], rec["agent_type"])] = rec["reaction"]
+            elif rec["kind"] == "round":
+                prev = self.rounds.get(rec["scenario"])
+                if prev is None or rec["round"] > prev["round"]:
+                    self.rounds[rec["scenario"]] = rec
+
+    @property
+    def resumable(self):
+        return bool(self.reactions or self.rounds)
+
+    # ── writing ──────────────────────────────────────────────────────────────
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def record_reaction(self, scenario, rnd, agent_type, reaction):
+        self.reactions[(scenario, rnd, agent_type)] = reaction
+        self._append({"kind": "reaction", "scenario": scenario, "round": rnd,
+                      "agent_type": agent_type, "reaction": reaction})
+
+    def record_round(self, scenario, rnd, round_logs, population, rng):
+        """Snapshot population arrays + RNG state after `rnd` finished."""
+        name = f"{scenario}_r{rnd}.npz"
+        path = os.path.join(self.state_dir, name)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **population.to_arrays())
+        os.replace(path + ".tmp", path)
+        record = {"kind": "round", "scenario": scenario, "round": rnd,
+                  "round_logs": round_logs, "state": name,
+                  "rng_state": rng.bit_generator.state}
+        self.rounds[scenario] = record
+        self._append(record)
+
+    # ── resuming ─────────────────────────────────────────────────────────────
+    def restore(self, scenario):
+        """(last completed round, round_logs, population, rng) or None."""
+        rec = self.rounds.get(scenario)
+        if rec is None:
+            return None
+        with np.load(os.path.join(self.state_dir, rec["state"])) as npz:
+            population = AgentPopulation.from_arrays({k: npz[k] for k in npz.files})
+        state = rec["rng_state"]
+        bit_generator = getattr(np.random, state["bit_generator"])()
+        bit_generator.state = state
+        return rec["round"], rec["round_logs"], population, np.random.Generator(bit_generator)
+
+    def clear(self):
+        shutil.rmtree(self.journal_dir, ignore_errors=True)
+        self.reactions, self.rounds = {}, {}
@@ -0,0 +1,57 @@
+"""
+Local Parametric Backend — Section 6 simulation
+===============================================
+Deterministic, offline stand-in for the DeepSeek agent-reaction call in
+campaign_sim.py. Each reaction field is a closed-form function of:
+
+    agent type   degen_score, initial_stance, rave_affected_share
+    scenario     rave_salience, rib_seed_72h
+    stimulus     round — each campaign round targets different funnel steps
+                 (ROUND_WEIGHTS: RIB launch → tombstones, confession/quiz →
+                 Telegram + UGC, Still Here / Pizza Day → KYC)
+
+Magnitudes are calibrated to the range of the cached DeepSeek runs so the
+pipeline, Monte Carlo ensemble and parameter sweeps can run in CI or on
+air-gapped machines at full CPU speed. It is a smoke-test and exploration
+model, not a substitute for the LLM results reported in Section 6.
+"""
+
+# round → peak per-round probability / stance shift / engagement weight
+ROUND_WEIGHTS = {
+    1: {"rib": 0.35, "confess": 0.03, "tg": 0.06, "ugc": 0.07, "kyc": 0.02,
+        "stance": 0.06, "depth": 0.70},
+    2: {"rib": 0.15, "confess": 0.25, "tg": 0.22, "ugc": 0.20, "kyc": 0.04,
+        "stance": 0.08, "depth": 0.85},
+    3: {"rib": 0.10, "confess": 0.08, "tg": 0.15, "ugc": 0.12, "kyc": 0.14,
+        "stance": 0.12, "depth": 1.00},
+}
+
+RIB_SEED_SATURATION = 500   # tombstones at which social proof stops adding pull
+
+
+def parametric_reaction(agent_type, scenario, stimulus):
+    """Reaction dict in the same shape as a DeepSeek reply (unclamped)."""
+    w = ROUND_WEIGHTS.get(stimulus["round"], ROUND_WEIGHTS[max(ROUND_WEIGHTS)])
+    degen = agent_type["degen_score"]
+    stance0 = agent_type["initial_stance"]
+    rave_share = agent_type["rave_affected_share"]
+    salience = scenario["rave_salience"]
+    proof = min(1.0, scenario["rib_seed_72h"] / RIB_SEED_SATURATION)
+
+    # the graveyard narrative lands hardest on degens who remember the crash
+    resonance = (0.4 + 0.6 * degen) * (0.5 + salience + rave_share)
+    # licensed-exchange pull is strongest for the less culturally committed
+    conversion = (1.4 - degen) * (1.0 + max(0.0, stance0))
+
+    return {
+        "rib_submission_probability": w["rib"] * resonance * (0.7 + 0.6 * proof),
+        "confession_probability":     w["confess"] * resonance,
+        "tg_join_probability":        w["tg"] * (0.5 + 0.5 * degen) * (0.8 + 0.4 * proof),
+        "ugc_share_probability":      w["ugc"] * (0.4 + 0.6 * degen) * (0.8 + 0.4 * proof),
+        "kyc_conversion_probability": w["kyc"] * conversion * (0.8 + 0.4 * proof),
+        "stance_change":              w["stance"] * (0.5 + salience) * (1.0 - stance0),
+        "engagement_depth":           round(1 + 4 * w["depth"] * (0.3 * degen + 0.4 * salience
+                                                                  + 0.3 * proof)),
+        "reasoning": (f"parametric: degen {degen:.2f}, RAVE salience {salience:.2f}, "
+                      f"{scenario['rib_seed_72h']} seed tombstones"),
+    }
@@ -0,0 +1,115 @@
+"""
+Run Metrics — Section 6 simulation
+==================================
+Timing, token and cost instrumentation for campaign_sim.py.
+
+    PhaseTimer     wall-clock time per named phase (reaction fetch, agent
+                   init, update loop, scaling, ensemble, ...); re-entering a
+                   phase accumulates, so per-scenario work sums up
+    build_metrics  combine CallStats records, phase timings and reaction
+                   sources (cache / api / journal / local) into one dict with
+                   p50 / p95 / p99 latency summaries and an estimated cost
+
+Written to data/simulation/metrics.json next to summary.txt, so two runs can be
+diffed to spot latency, token or cost regressions.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# DeepSeek list price, USD per 1M tokens (cache-miss input / output)
+PRICE_PER_M_PROMPT     = 0.27
+PRICE_PER_M_COMPLETION = 1.10
+
+
+class PhaseTimer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {}   # phase → [seconds, entries]
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                t = self.totals.setdefault(name, [0.0, 0])
+                t[0] += elapsed
+                t[1] += 1
+
+    def summary(self):
+        with self._lock:
+            return {name: {"seconds": round(s, 6), "entries": n}
+                    for name, (s, n) in self.totals.items()}
+
+
+def percentiles(values):
+    """mean / p50 / p95 / p99 / max of `values` (None fields when empty)."""
+    if not len(values):
+        return {"n": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    arr = np.asarray(values, dtype=float)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"n": int(arr.size), "mean": float(arr.mean()), "p50": float(p50),
+            "p95": float(p95), "p99": float(p99), "max": float(arr.max())}
+
+
+def estimate_cost(prompt_tokens, completion_tokens):
+    """USD at list price, or None when the token counts are unknown."""
+    if prompt_tokens is None or completion_tokens is None:
+        return None
+    return (prompt_tokens * PRICE_PER_M_PROMPT
+            + completion_tokens * PRICE_PER_M_COMPLETION) / 1_000_000
+
+
+def build_metrics(call_stats, phases, sources, run_info=None):
+    """
+    `call_stats` is an evaluator.CallStats, `phases` a PhaseTimer and `sources`
+    a {source: reactions resolved} count. Returns a JSON-serialisable dict.
+    """
+    records = call_stats.records()
+    by_mode = {}
+    for mode, totals in call_stats.summary().items():
+        calls = [r for r in records if r["mode"] == mode]
+        by_mode[mode] = {
+            **totals,
+            "latency_s": percentiles([r["latency_s"] for r in calls]),
+            "total_latency_s": totals["latency_s"],
+            # per-call distributions over the calls whose usage was reported
+            "prompt_tokens_per_call": percentiles([r["prompt_tokens"] for r in calls
+                                                   if r["prompt_tokens"] is not None]),
+            "completion_tokens_per_call": percentiles([r["completion_tokens"] for r in calls
+                                                       if r["completion_tokens"] is not None]),
+            "retries_per_call": percentiles([r["retries"] for r in calls]),
+            "est_cost_usd": estimate_cost(totals["prompt_tokens"], totals["completion_tokens"]),
+        }
+    unknown = any(m["prompt_tokens"] is None for m in by_mode.values())
+    prompt = None if unknown else sum(m["prompt_tokens"] for m in by_mode.values())
+    completion = None if unknown else sum(m["completion_tokens"] for m in by_mode.values())
+    resolved = sum(sources.values())
+    return {
+        "run": run_info or {},
+        "phases": phases.summary(),
+        "reactions": {
+            "sources": dict(sources),
+            "cache_hit_rate": (sources.get("cache", 0) / resolved) if resolved else None,
+        },
+        "api": {
+            "by_mode": by_mode,
+            "latency_s": percentiles([r["latency_s"] for r in records]),
+            "prompt_tokens": prompt,          # None: some replies reported no usage
+            "completion_tokens": completion,
+            "usage_unknown_calls": sum(m.get("usage_unknown", 0) for m in by_mode.values()),
+            "est_cost_usd": estimate_cost(prompt, completion),
+        },
+    }
+
+
+def write_metrics(path, metrics):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2, ensure_ascii=False)
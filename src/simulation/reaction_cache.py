@@ -0,0 +1,111 @@
+"""
+Reaction Cache — Section 6 simulation
+=====================================
+Content-addressed on-disk cache for DeepSeek agent reactions. Entries are keyed
+by a SHA-256 of (model, temperature, max_tokens, rendered prompt), so any change
+to an agent profile, scenario, stimulus or sampling setting misses naturally.
+
+Eviction is age-based (entries written more than `max_age_days` ago are
+dropped, however often they are read) and size-based (least-recently-used
+entries are removed once the cache exceeds `max_bytes`). A file's mtime is its
+write time and is never touched afterwards; its atime, set explicitly on every
+hit, is the recency used for LRU. Writes are atomic, so concurrent evaluator
+threads are safe.
+
+Layout:
+    data/simulation/cache/<key[:2]>/<key>.json
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+def cache_key(model, temperature, max_tokens, prompt):
+    payload = json.dumps(
+        {"model": model, "temperature": temperature,
+         "max_tokens": max_tokens, "prompt": prompt},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReactionCache:
+    def __init__(self, cache_dir, max_bytes=50 * 1024 * 1024, max_age_days=30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _expired(self, path, now=None):
+        """Age since the entry was written (mtime), independent of reads."""
+        return (now or time.time()) - os.path.getmtime(path) > self.max_age
+
+    def get(self, key):
+        """Return the cached reaction for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            if self._expired(path):
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            # `created` also catches entries whose mtime an older version refreshed on read
+            if time.time() - entry.get("created", 0) > self.max_age:
+                os.remove(path)
+                raise FileNotFoundError(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # refresh recency (atime) for LRU eviction; mtime keeps the write time for expiry
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+        self.hits += 1
+        return entry["reaction"]
+
+    def put(self, key, reaction, **meta):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"key": key, "created": time.time(), "reaction": reaction, **meta}
+        tmp = f"{path}.{os.getpid()}.{id(entry)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def __contains__(self, key):
+        path = self._path(key)
+        return os.path.exists(path) and not self._expired(path)
+
+    def prune(self):
+        """Drop expired entries, then LRU entries until under max_bytes. Returns #removed."""
+        now = time.time()
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_atime, st.st_size, path))
+
+        removed = 0
+        live = []
+        for mtime, atime, size, path in entries:
+            if now - mtime > self.max_age:
+                os.remove(path)
+                removed += 1
+            else:
+                live.append((max(atime, mtime), size, path))
+
+        total = sum(size for _, size, _ in live)
+        for last_used, size, path in sorted(live):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,122 @@
+"""
+Reaction Schema — Section 6 simulation
+======================================
+Parsing and validation of the DeepSeek agent reactions used by campaign_sim.py.
+
+    JsonExtractor     incremental scanner: feed it streamed text chunks and it
+                      reports the first complete top-level JSON object / array
+                      as soon as its closing bracket arrives, ignoring markdown
+                      fences and any prose around it
+    extract_json      one-shot version for a complete response string
+    validate_reaction check all eight reaction fields, coerce numeric strings
+                      and clamp every value into its documented range
+
+Anything that cannot be repaired raises InvalidReaction, so the caller can retry
+instead of silently substituting fallback values.
+"""
+
+import json
+import math
+
+# field → (type, lower bound, upper bound); bounds match the prompt's spec
+REACTION_SCHEMA = {
+    "rib_submission_probability": (float, 0.0, 1.0),
+    "confession_probability":     (float, 0.0, 1.0),
+    "tg_join_probability":        (float, 0.0, 1.0),
+    "ugc_share_probability":      (float, 0.0, 1.0),
+    "kyc_conversion_probability": (float, 0.0, 1.0),
+    "stance_change":              (float, -0.3, 0.5),
+    "engagement_depth":           (int, 1, 5),
+    "reasoning":                  (str, None, None),
+}
+
+REACTION_FIELDS = tuple(f for f, (kind, _, _) in REACTION_SCHEMA.items() if kind is not str)
+
+
+class InvalidReaction(ValueError):
+    pass
+
+
+class JsonExtractor:
+    """Find the first balanced {...} or [...] in text arriving chunk by chunk."""
+
+    def __init__(self, opener="{"):
+        self.opener = opener
+        self.closer = {"{": "}", "[": "]"}[opener]
+        self._buf = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.result = None
+
+    def feed(self, chunk):
+        """Consume `chunk`; returns the complete JSON text once it is closed, else None."""
+        if self.result is not None:
+            return self.result
+        for ch in chunk:
+            if self._depth == 0:
+                if ch != self.opener:
+                    continue   # fences / prose before the payload
+            elif self._in_string:
+                self._buf.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            self._buf.append(ch)
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.result = "".join(self._buf)
+                    return self.result
+        return None
+
+
+def extract_json(text, opener="{"):
+    """Parse the first complete JSON value starting with `opener` in `text`."""
+    extractor = JsonExtractor(opener)
+    payload = extractor.feed(text or "")
+    if payload is None:
+        raise InvalidReaction("no complete JSON value in response")
+    try:
+        return json.loads(payload)
+    except ValueError as e:
+        raise InvalidReaction(f"malformed JSON: {e}") from e
+
+
+def _coerce(field, value, kind, lo, hi):
+    if kind is str:
+        return value.strip() if isinstance(value, str) else ""
+    if isinstance(value, bool):
+        raise InvalidReaction(f"{field}: expected a number, got {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidReaction(f"{field}: expected a number, got {value!r}") from None
+    if not math.isfinite(number):
+        raise InvalidReaction(f"{field}: non-finite value {value!r}")
+    number = min(hi, max(lo, number))
+    return int(round(number)) if kind is int else number
+
+
+def validate_reaction(obj):
+    """
+    Return a clean reaction dict holding exactly the schema fields, with values
+    clamped into range. A missing `reasoning` becomes ""; any other missing or
+    non-numeric field raises InvalidReaction.
+    """
+    if not isinstance(obj, dict):
+        raise InvalidReaction(f"expected a JSON object, got {type(obj).__name__}")
+    reaction = {}
+    for field, (kind, lo, hi) in REACTION_SCHEMA.items():
+        if field not in obj and kind is not str:
+            raise InvalidReaction(f"missing field {field}")
+        reaction[field] = _coerce(field, obj.get(field), kind, lo, hi)
+    return reaction
@@ -0,0 +1,268 @@
+"""
+Scenario Parameter Sweep — Section 6 simulation
+===============================================
+Sensitivity surfaces over the SCENARIOS knobs (rave_salience, rib_seed_72h,
+kol_reach_multiplier). Expands a full grid or a Latin hypercube into sweep
+cells, each a copy of a base scenario with the knobs overridden.
+
+  - LLM stage: identical prompt renderings are deduplicated by
+    campaign_sim.fetch_reactions — kol_reach_multiplier never enters the prompt,
+    so it costs no extra calls — and the reaction cache is honoured.
+  - Simulation stage: cells are chunked across a process pool; each finished
+    chunk is checkpointed, so an interrupted sweep resumes where it stopped.
+  - Output: one columnar NPZ (knob columns + KPI columns), cheap to load from
+    generate_charts.py even with thousands of cells.
+
+Usage:
+    python src/simulation/sweep.py --grid rave_salience=0.2:0.9:8 \\
+        --grid rib_seed_72h=40,180,420 --grid kol_reach_multiplier=0.6:1.45:6
+    python src/simulation/sweep.py --lhs 500 --cache-only
+    python src/simulation/sweep.py --lhs 5000 --backend local    # offline, no API
+
+Output:
+    data/simulation/sweep/sweep_results.npz
+"""
+
+import os
+import sys
+import json
+import glob
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from campaign_sim import (
+    AGENT_TYPES, SCENARIOS, STIMULI, FALLBACK_REACTION, RANDOM_SEED,
+    MAX_CONCURRENCY, RATE_LIMIT_RPS, CACHE_DIR, CACHE_MAX_BYTES, CACHE_MAX_AGE_DAYS,
+    BACKENDS, ReactionCache, fetch_reactions, missing_reactions, get_backend,
+)
+from population import AgentPopulation, allocate_counts, make_rng, predict_kpis
+
+SWEEP_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "simulation", "sweep")
+
+# knob → (lower bound, upper bound, decimals) — bounds span the three SCENARIOS;
+# values are quantised so near-identical LHS draws share a prompt rendering
+KNOBS = {
+    "rave_salience":        (0.2, 0.9, 2),
+    "rib_seed_72h":         (40, 420, 0),
+    "kol_reach_multiplier": (0.6, 1.45, 2),
+}
+
+SWEEP_STREAM = 6   # spawn-key prefix keeping sweep RNG streams apart from scenario streams
+CHUNK_SIZE   = 64
+
+
+# ── Design expansion ──────────────────────────────────────────────────────────
+
+def _quantise(knob, values):
+    decimals = KNOBS[knob][2]
+    values = np.round(np.asarray(values, dtype=float), decimals)
+    return values.astype(int) if decimals == 0 else values
+
+
+def parse_grid_spec(spec):
+    """'knob=a,b,c' (explicit values) or 'knob=lo:hi:n' (linspace) → (knob, values)."""
+    knob, _, values = spec.partition("=")
+    if knob not in KNOBS:
+        raise ValueError(f"unknown knob '{knob}' (choose from {', '.join(KNOBS)})")
+    if ":" in values:
+        lo, hi, n = values.split(":")
+        vals = np.linspace(float(lo), float(hi), int(n))
+    else:
+        vals = [float(v) for v in values.split(",")]
+    return knob, np.unique(_quantise(knob, vals))
+
+
+def expand_grid(grid, base):
+    """Cartesian product; knobs absent from `grid` stay at the base scenario value."""
+    axes = [grid.get(k, _quantise(k, [base[k]])) for k in KNOBS]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return {k: m.ravel() for k, m in zip(KNOBS, mesh)}
+
+
+def latin_hypercube(n, seed=RANDOM_SEED):
+    """n-point Latin hypercube over the KNOBS bounds."""
+    rng = make_rng(seed, SWEEP_STREAM)
+    design = {}
+    for knob, (lo, hi, _) in KNOBS.items():
+        u = (rng.permutation(n) + rng.random(n)) / n
+        design[knob] = _quantise(knob, lo + u * (hi - lo))
+    return design
+
+
+def build_cells(design, base_name):
+    base = SCENARIOS[base_name]
+    n = len(next(iter(design.values())))
+    cells = {}
+    for i in range(n):
+        cell = dict(base)
+        cell.update({k: design[k][i].item() for k in KNOBS})
+        cell["label"] = f"{base['label']} #{i}"
+        cells[f"cell_{i:06d}"] = cell
+    return cells
+
+
+# ── Simulation stage ──────────────────────────────────────────────────────────
+
+def _simulate_chunk(task):
+    agent_types, counts, seed, replicates, cells = task
+    rows = []
+    for cell_idx, scenario, round_reactions in cells:
+        draws = []
+        for rep in range(replicates):
+            rng = make_rng(seed, SWEEP_STREAM, cell_idx, rep)
+            population = AgentPopulation.initialise(agent_types, rng, counts)
+            for reactions in round_reactions:
+                population.apply_round(reactions, rng)
+            draws.append(predict_kpis(population, agent_types, scenario))
+        rows.append((cell_idx, {m: float(np.mean([d[m] for d in draws])) for m in draws[0]}))
+    return rows
+
+
+def _fingerprint(design, base_name, population, replicates, backend):
+    payload = json.dumps({
+        "design": {k: v.tolist() for k, v in design.items()},
+        "base": base_name, "population": population, "replicates": replicates,
+        "backend": backend,
+        "seed": RANDOM_SEED, "agent_types": AGENT_TYPES, "stimuli": STIMULI,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_checkpoints(chunk_dir):
+    done = {}
+    for path in sorted(glob.glob(os.path.join(chunk_dir, "*.npz"))):
+        with np.load(path) as chunk:
+            cols = {k: chunk[k] for k in chunk.files}
+        for j, cell_idx in enumerate(cols.pop("cell")):
+            done[int(cell_idx)] = {m: float(v[j]) for m, v in cols.items()}
+    return done
+
+
+def _save_checkpoint(chunk_dir, rows):
+    first = min(cell_idx for cell_idx, _ in rows)
+    metrics = rows[0][1].keys()
+    cols = {"cell": np.array([c for c, _ in rows])}
+    cols.update({m: np.array([r[m] for _, r in rows]) for m in metrics})
+    path = os.path.join(chunk_dir, f"{first:06d}.npz")
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, **cols)
+    os.replace(path + ".tmp", path)
+
+
+def run_sweep(design, base_name, backend, cache, out_dir=SWEEP_DIR, population=None,
+              replicates=1, workers=None, max_workers=MAX_CONCURRENCY, rate=RATE_LIMIT_RPS,
+              chunk_size=CHUNK_SIZE):
+    cells = build_cells(design, base_name)
+    names = list(cells)
+    print(f"Sweep: {len(cells)} cells × {replicates} replicate(s), base='{base_name}'")
+
+    os.makedirs(out_dir, exist_ok=True)
+    chunk_dir = os.path.join(out_dir, "checkpoints")
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    fingerprint = _fingerprint(design, base_name, population, replicates,
+                               backend.name if backend else "deepseek")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") != fingerprint:
+                print("  Design changed since last checkpoint — starting fresh.")
+                shutil.rmtree(chunk_dir, ignore_errors=True)
+    os.makedirs(chunk_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "cells": len(cells), "base": base_name,
+                   "population": population, "replicates": replicates}, f, indent=2)
+
+    done = _load_checkpoints(chunk_dir)
+    todo = [i for i in range(len(cells)) if i not in done]
+    if done:
+        print(f"  Resuming: {len(done)} cell(s) already checkpointed, {len(todo)} to go")
+
+    if todo:
+        reactions = fetch_reactions(backend, {names[i]: cells[names[i]] for i in todo},
+                                    cache=cache, max_workers=max_workers, rate=rate)
+        counts = allocate_counts(AGENT_TYPES, population)
+        work, fallbacks = [], 0
+        for i in todo:
+            rounds = [{a: (reactions[names[i]][s["round"]].get(a) or FALLBACK_REACTION)
+                       for a in AGENT_TYPES} for s in STIMULI]
+            fallbacks += sum(reactions[names[i]][s["round"]].get(a) is None
+                             for s in STIMULI for a in AGENT_TYPES)
+            work.append((i, cells[names[i]], rounds))
+        if fallbacks:
+            print(f"  WARNING: {fallbacks} reaction(s) failed — fallback values used")
+        tasks = [(AGENT_TYPES, counts, RANDOM_SEED, replicates, work[k:k + chunk_size])
+                 for k in range(0, len(work), chunk_size)]
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_simulate_chunk, t) for t in tasks]
+            for n, fut in enumerate(as_completed(futures), 1):
+                rows = fut.result()
+                _save_checkpoint(chunk_dir, rows)
+                done.update(dict(rows))
+                print(f"  chunk {n}/{len(tasks)} checkpointed ({len(done)}/{len(cells)} cells)")
+
+    metrics = list(done[0])
+    columns = {"cell": np.arange(len(cells))}
+    columns.update({k: np.asarray(design[k]) for k in KNOBS})
+    columns.update({m: np.array([done[i][m] for i in range(len(cells))]) for m in metrics})
+    out_path = os.path.join(out_dir, "sweep_results.npz")
+    np.savez_compressed(out_path, **columns)
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+    os.remove(manifest_path)
+    print(f"\n✓ Sweep results saved → {out_path}")
+    return out_path
+
+
+# ── Entry Point ───────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parameter sweep over SCENARIOS knobs")
+    design = parser.add_mutually_exclusive_group(required=True)
+    design.add_argument("--grid", action="append", metavar="KNOB=VALUES",
+                        help="grid axis: 'knob=a,b,c' or 'knob=lo:hi:n' (repeatable)")
+    design.add_argument("--lhs", type=int, metavar="N",
+                        help="Latin hypercube with N cells over all knobs")
+    parser.add_argument("--base", default="base", choices=list(SCENARIOS),
+                        help="scenario supplying descriptions and unswept knobs")
+    parser.add_argument("--population", type=int, default=None)
+    parser.add_argument("--replicates", type=int, default=1,
+                        help="seeded replicates averaged per cell")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_RPS)
+    parser.add_argument("--cache-only", action="store_true")
+    parser.add_argument("--backend", choices=BACKENDS, default="deepseek")
+    parser.add_argument("--out-dir", default=SWEEP_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.grid:
+        design = expand_grid(dict(parse_grid_spec(g) for g in args.grid), SCENARIOS[args.base])
+    else:
+        design = latin_hypercube(args.lhs)
+
+    cache = ReactionCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES, max_age_days=CACHE_MAX_AGE_DAYS)
+    if args.cache_only and args.backend == "deepseek":
+        missing = missing_reactions(build_cells(design, args.base), cache)
+        if missing:
+            print(f"ERROR: {len(missing)} reaction(s) missing from cache, e.g. {missing[0]}.")
+            sys.exit(1)
+        backend = None
+    else:
+        backend = get_backend(args.backend)
+
+    run_sweep(design, args.base, backend, cache, out_dir=args.out_dir,
+              population=args.population, replicates=args.replicates,
+              workers=args.workers, max_workers=args.concurrency, rate=args.rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -285,9 +285,10 @@ def chart_user_profile():
 
 
 if __name__ == "__main__":
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from visualization.render import discover, render_all
+
     print("Generating Section 2.3 benchmark charts...")
-    chart_brand_matrix()
-    chart_motivation_compare()
-    chart_discovery_overlap()
-    chart_user_profile()
+    render_all(discover(["benchmark_charts"]))   # unchanged charts are reused from the build cache
     print("Done. All 4 charts saved to outputs/")
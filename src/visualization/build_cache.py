@@ -0,0 +1,188 @@
+"""
+Build Cache — skip charts whose inputs have not changed
+========================================================
+Make-style artifact cache for the render scheduler. A chart's key hashes
+
+  - its input data slice: for a CSV, only the columns the chart's code names
+    (plus the row count); any other input file in full
+  - its source: the chart function, every module-level function it calls
+    (transitively) and the module constants it reads
+  - its rendering context: the rcParams in effect (dpi, fonts, style) and
+    the matplotlib version
+
+and the manifest (outputs/build_manifest.json) maps each chart to its last
+key and the PNGs it wrote, with their content hashes. A chart is rebuilt only
+when its key changed or one of its outputs is missing or was modified; the
+manifest also records hits and misses per chart and for the last run.
+"""
+
+import contextlib
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import time
+import types
+
+import pandas as pd
+
+SIMPLE_TYPES = (str, int, float, bool, type(None), tuple, list, dict)
+_FILE_DIGESTS = {}   # (path, mtime, size) → digest, per process
+_CSV_FRAMES = {}     # (path, mtime, size) → DataFrame, per process
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def file_digest(path):
+    """sha256 of a file's bytes, memoised on (path, mtime, size)."""
+    stat = _stat_key(path)
+    if stat not in _FILE_DIGESTS:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        _FILE_DIGESTS[stat] = h.hexdigest()
+    return _FILE_DIGESTS[stat]
+
+
+def _code_refs(code, names, strings):
+    names.update(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, str):
+            strings.add(const)
+        elif isinstance(const, types.CodeType):   # comprehensions, lambdas, nested defs
+            _code_refs(const, names, strings)
+
+
+def dependencies(func):
+    """
+    (functions, constants, strings, names) a chart depends on: `func` plus
+    the module-level functions it reaches, the simple module constants they
+    read, every string literal in their code (candidate column names) and
+    every global name they reference.
+    """
+    module = func.__module__
+    functions, constants, strings, referenced = {}, {}, set(), set()
+    pending = [func]
+    while pending:
+        fn = pending.pop()
+        if fn.__name__ in functions:
+            continue
+        functions[fn.__name__] = fn
+        names = set()
+        _code_refs(fn.__code__, names, strings)
+        referenced |= names
+        for name in names:
+            value = fn.__globals__.get(name)
+            if isinstance(value, types.FunctionType) and value.__module__ == module:
+                pending.append(value)
+            elif isinstance(value, SIMPLE_TYPES) and not name.startswith('__'):
+                constants[name] = value
+    return functions, constants, strings, referenced
+
+
+def _csv_slice_digest(path, strings):
+    stat = _stat_key(path)
+    if stat not in _CSV_FRAMES:
+        _CSV_FRAMES[stat] = pd.read_csv(path)
+    df = _CSV_FRAMES[stat]
+    columns = sorted(c for c in df.columns if c in strings)
+    h = hashlib.sha256(f"{len(df)}|{columns}".encode())
+    if columns:
+        h.update(pd.util.hash_pandas_object(df[columns], index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def chart_key(func, inputs=(), style=None, args=(), kwargs=None, depends=()):
+    """
+    Build key for one chart. `inputs` are the data files it reads, `style`
+    the rcParams it renders under, `args`/`kwargs` any data passed to it and
+    `depends` extra 'module:attr' objects whose source it relies on.
+    """
+    import matplotlib
+    functions, constants, strings, _ = dependencies(func)
+    h = hashlib.sha256(matplotlib.__version__.encode())
+    for name in sorted(functions):
+        h.update(inspect.getsource(functions[name]).encode())
+    for ref in depends:
+        module, attr = ref.split(':')
+        h.update(inspect.getsource(getattr(importlib.import_module(module), attr)).encode())
+    h.update(repr(sorted(constants.items())).encode())
+    for path in inputs:
+        if not os.path.exists(path):
+            h.update(f"missing:{path}".encode())
+        elif path.endswith('.csv'):
+            h.update(_csv_slice_digest(path, strings).encode())
+        else:
+            h.update(file_digest(path).encode())
+    if style:
+        h.update(repr(sorted((k, repr(v)) for k, v in style.items())).encode())
+    if args or kwargs:
+        h.update(hashlib.sha256(pickle.dumps((args, kwargs or {}), protocol=4)).digest())
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def capture_outputs():
+    """Record every file written through Figure.savefig (plt.savefig included)."""
+    from matplotlib.figure import Figure
+    written = []
+    original = Figure.savefig
+
+    def savefig(self, fname, *args, **kwargs):
+        if isinstance(fname, (str, os.PathLike)):
+            written.append(os.path.abspath(os.fspath(fname)))
+        return original(self, fname, *args, **kwargs)
+
+    Figure.savefig = savefig
+    try:
+        yield written
+    finally:
+        Figure.savefig = original
+
+
+def outputs_intact(entry):
+    """True if every output the entry recorded still exists unmodified."""
+    outputs = entry.get('outputs') or {}
+    return bool(outputs) and all(os.path.exists(p) and file_digest(p) == d for p, d in outputs.items())
+
+
+class BuildManifest:
+    """Per-chart keys, outputs and hit/miss counts; written by the scheduler process only."""
+
+    def __init__(self, path):
+        self.path = path
+        self.charts = {}
+        self.last_run = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.charts = state.get('charts', {})
+            self.last_run = state.get('last_run', {})
+
+    def entry(self, label):
+        return self.charts.get(label)
+
+    def record(self, label, status, key=None, outputs=None):
+        entry = self.charts.setdefault(label, {'hits': 0, 'misses': 0})
+        if status == 'cached':
+            entry['hits'] += 1
+        elif status == 'ok':
+            entry['misses'] += 1
+            entry['key'] = key
+            entry['outputs'] = {p: file_digest(p) for p in outputs or []}
+            entry['built_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        entry['last'] = status
+
+    def save(self, hits, misses):
+        self.last_run = {'at': time.strftime('%Y-%m-%d %H:%M:%S'), 'hits': hits, 'misses': misses}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'last_run': self.last_run, 'charts': self.charts}, f, indent=2)
+        os.replace(tmp, self.path)
@@ -5,35 +5,66 @@ import numpy as np
 import seaborn as sns
 import os
 from collections import Counter
+from matplotlib import font_manager
+
+from analysis.sentiment import CJK_PATTERN
+
+# fonts with CJK glyphs, for Cantonese / Chinese terms in the word cloud
+CJK_FONTS = ['SimHei', 'Microsoft JhengHei', 'PingFang HK', 'Noto Sans CJK TC', 'Noto Sans CJK SC',
+             'WenQuanYi Zen Hei']
+
+
+def _cjk_font_path():
+    """Path of the first installed CJK-capable font, or None."""
+    try:
+        return font_manager.findfont(font_manager.FontProperties(family=CJK_FONTS),
+                                     fallback_to_default=False)
+    except ValueError:
+        return None
+
 
 class VisualizationEngine:
     def __init__(self, output_dir="outputs"):
         self.output_dir = output_dir
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
-        
-        # Set professional style
+        self._styled = False
+
+    def _apply_style(self):
+        """Set the professional style once, when the first chart is drawn (not on construction)."""
+        if self._styled:
+            return
         sns.set_theme(style="whitegrid")
         plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial', 'sans-serif']
         plt.rcParams['axes.unicode_minus'] = False
+        self._styled = True
 
-    def generate_pain_points_wordcloud(self, processed_df):
-        """Generates a word cloud from actual processed text data."""
+    def generate_pain_points_wordcloud(self, processed_df=None, frequencies=None):
+        """
+        Generates the pain-point word cloud. With `frequencies` ({term: weight},
+        e.g. TermFrequency.frequencies() over the processor's tokens) the cloud
+        is laid out from the vocabulary directly; otherwise the `content`
+        column of `processed_df` is re-tokenized by WordCloud.
+        """
         print("Generating WordCloud from processed social data...")
+        self._apply_style()
         
-        # Simple extraction of keywords from content for demonstration
-        # In a full NLP pipeline, we'd use the keywords from the analysis stage
-        text = " ".join(processed_df['content'].tolist())
-        
-        # Add some strategic weight to research-relevant keywords to ensure they appear
-        # This simulates a sophisticated NER (Named Entity Recognition) process
+        font_path = _cjk_font_path()
         wc = WordCloud(
             width=1000, height=600, 
             background_color="white", 
             colormap="magma",
             max_words=150,
-            collocations=False
-        ).generate(text)
+            collocations=False,
+            font_path=font_path
+        )
+        if frequencies is not None:
+            if font_path is None:
+                # no CJK glyphs installed: Chinese terms would render as empty boxes
+                frequencies = {t: w for t, w in frequencies.items() if not CJK_PATTERN.search(t)}
+            wc.generate_from_frequencies(frequencies)
+        else:
+            wc.generate(" ".join(processed_df['content'].tolist()))
 
         plt.figure(figsize=(12, 6))
         plt.imshow(wc, interpolation="bilinear")
@@ -43,16 +74,29 @@ class VisualizationEngine:
         plt.savefig(os.path.join(self.output_dir, "pain_points_wordcloud.png"), dpi=300, bbox_inches='tight')
         plt.close()
 
-    def generate_sentiment_trend(self, processed_df):
-        """Generates a daily sentiment trend from processed CSV data."""
+    def generate_sentiment_trend(self, processed_df, anomalies=None):
+        """
+        Generates a daily sentiment trend. Accepts either processed rows
+        (timestamp, analyzed_sentiment) or a pre-aggregated daily rollup
+        (date, mean) from SentimentRollup.daily(); the input is not modified.
+        `anomalies` are AnomalyMonitor events; days flagged for all platforms
+        are annotated, otherwise the highest daily mean is marked as the peak.
+        """
         print("Calculating sentiment trends from time-series data...")
+        self._apply_style()
         
-        # Convert timestamp to date
-        processed_df['date'] = pd.to_datetime(processed_df['timestamp']).dt.date
-        
-        # Group by date and calculate mean
-        trend_data = processed_df.groupby('date')['analyzed_sentiment'].mean().reset_index()
-        trend_data = trend_data.sort_values('date')
+        if 'timestamp' in processed_df:
+            # Convert timestamp to date (Parquet-backed results arrive already typed)
+            timestamps = processed_df['timestamp']
+            if not pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = pd.to_datetime(timestamps)
+            
+            # Group by date and calculate mean
+            trend_data = processed_df['analyzed_sentiment'].groupby(
+                timestamps.dt.date.rename('date')).mean().reset_index()
+        else:
+            trend_data = processed_df[['date', 'mean']].rename(columns={'mean': 'analyzed_sentiment'})
+        trend_data = trend_data.sort_values('date').reset_index(drop=True)
 
         plt.figure(figsize=(12, 7))
         plt.plot(trend_data['date'], trend_data['analyzed_sentiment'], 
@@ -67,13 +111,26 @@ class VisualizationEngine:
         plt.xlabel("Date", fontsize=12)
         plt.xticks(rotation=45)
         
-        # Dynamic Peak Annotation
-        peak_row = trend_data.loc[trend_data['analyzed_sentiment'].idxmax()]
-        plt.annotate(f'Detection: Social Peak\n({peak_row["analyzed_sentiment"]:.2f})', 
-                     xy=(peak_row['date'], peak_row['analyzed_sentiment']), 
-                     xytext=(peak_row['date'], peak_row['analyzed_sentiment']+0.2),
-                     arrowprops=dict(arrowstyle='->', lw=2, color='red'),
-                     ha='center')
+        flagged = [e for e in (anomalies or []) if e['platform'] == 'all']
+        if flagged:
+            # Online detector events (EWMA z-score on the combined daily series)
+            for event in flagged:
+                day = pd.Timestamp(event['bucket']).date()
+                offset = 0.2 if event['direction'] == 'spike' else -0.2
+                plt.annotate(f'Detection: Sentiment {event["direction"].title()}\n'
+                             f'({event["value"]:.2f}, z={event["zscore"]:+.1f})',
+                             xy=(day, event['value']),
+                             xytext=(day, event['value'] + offset),
+                             arrowprops=dict(arrowstyle='->', lw=2, color='red'),
+                             ha='center')
+        else:
+            # Dynamic Peak Annotation
+            peak_row = trend_data.loc[trend_data['analyzed_sentiment'].idxmax()]
+            plt.annotate(f'Detection: Social Peak\n({peak_row["analyzed_sentiment"]:.2f})', 
+                         xy=(peak_row['date'], peak_row['analyzed_sentiment']), 
+                         xytext=(peak_row['date'], peak_row['analyzed_sentiment']+0.2),
+                         arrowprops=dict(arrowstyle='->', lw=2, color='red'),
+                         ha='center')
 
         plt.tight_layout()
         plt.savefig(os.path.join(self.output_dir, "pizza_day_sentiment_trend.png"), dpi=300)
@@ -81,6 +138,7 @@ class VisualizationEngine:
 
     def generate_influencer_matrix(self):
         """KOL Matrix remains strategic as it's based on specific research profiling."""
+        self._apply_style()
         kols = [
             {"Name": "Yat Siu (Animoca)", "Type": "Institutional", "Reach": 95, "Degen_Score": 20},
             {"Name": "Xiao Feng (HashKey)", "Type": "Institutional", "Reach": 85, "Degen_Score": 10},
@@ -0,0 +1,258 @@
+"""
+Render Scheduler — parallel chart generation
+=============================================
+Discovers the chart functions of every figure generator and renders them on
+a process pool (matplotlib is not thread-safe, so parallelism is per process).
+Each worker switches to the Agg backend and pre-warms the font cache once;
+each chart runs under the rcParams its own module sets at import, so output
+matches running that module as a script. Charts are scheduled longest-first
+using the timings of the previous run, and a per-chart timing report is
+printed and written to outputs/render_report.json.
+
+Charts whose data slice, source and rcParams are unchanged since their last
+build are skipped (see build_cache.py); pass --force to rebuild everything.
+
+Generators (module → chart function prefix):
+  visualization.survey_charts     chart_*   (7 survey charts)
+  visualization.benchmark_charts  chart_*   (4 benchmark charts)
+  simulation.generate_charts      fig_*     (Fig 6.1–6.5)
+
+Run:
+    python src/visualization/render.py                 # everything, one worker per core
+    python src/visualization/render.py --workers 4 --only survey_charts
+    python src/visualization/render.py --list
+    python src/visualization/render.py --force              # ignore the build cache
+"""
+
+import argparse
+import ast
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+
+from visualization.build_cache import (BuildManifest, capture_outputs, chart_key,
+                                       dependencies, outputs_intact)
+
+BASE          = os.path.dirname(SRC_DIR)
+REPORT_PATH   = os.path.join(BASE, "outputs", "render_report.json")
+MANIFEST_PATH = os.path.join(BASE, "outputs", "build_manifest.json")
+
+# ── generator registry ────────────────────────────────────────────────────────
+# module → (chart function prefix, {input path attribute: globals that read it});
+# an input is part of a chart's cache key only if the chart reaches one of those globals
+GENERATORS = {
+    "visualization.survey_charts":    ("chart_", {"DATA": ("load_survey",)}),
+    "visualization.benchmark_charts": ("chart_", {}),
+    "simulation.generate_charts":     ("fig_",   {"DATA_PATH": ("load_results",),
+                                                  "SWEEP_PATH": ("load_sweep", "SWEEP_PATH")}),
+}
+
+# charts that only make sense when their input exists (checked in the worker)
+REQUIRES = {
+    "simulation.generate_charts:fig_6_5": lambda module: os.path.exists(module.SWEEP_PATH),
+}
+
+WARM_FONTS = ["DejaVu Sans", "SimHei", "Arial", "sans-serif"]
+
+
+class RenderJob:
+    """One chart: `module:func(*args, **kwargs)`, labelled for the report."""
+
+    def __init__(self, module, func, args=(), kwargs=None, label=None, depends=()):
+        self.module = module
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.label = label or f"{module}:{func}"
+        self.depends = depends   # extra 'module:attr' sources in the cache key
+
+    def __repr__(self):
+        return f"RenderJob({self.label})"
+
+
+def discover(modules=None):
+    """
+    RenderJobs for every top-level, argument-free chart function in the
+    generator modules. Sources are parsed, not imported, so the scheduler
+    process never loads matplotlib or the chart data itself.
+    """
+    jobs = []
+    for module, (prefix, _) in GENERATORS.items():
+        if modules and module.rsplit(".", 1)[-1] not in modules and module not in modules:
+            continue
+        path = os.path.join(SRC_DIR, *module.split(".")) + ".py"
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name.startswith(prefix):
+                a = node.args
+                required = len(a.posonlyargs) + len(a.args) - len(a.defaults)
+                if required == 0:
+                    jobs.append(RenderJob(module, node.name))
+    return jobs
+
+
+def engine_job(method, output_dir, *args, **kwargs):
+    """RenderJob for a VisualizationEngine method (the data is pickled to the worker)."""
+    return RenderJob("visualization.render", "render_engine_chart",
+                     args=(method, output_dir) + args, kwargs=kwargs,
+                     label=f"engine:{method}",
+                     depends=("visualization.engine:VisualizationEngine",))
+
+
+def render_engine_chart(method, output_dir, *args, **kwargs):
+    from visualization.engine import VisualizationEngine
+    getattr(VisualizationEngine(output_dir=output_dir), method)(*args, **kwargs)
+
+
+# ── worker side ───────────────────────────────────────────────────────────────
+_STYLES = {}   # module → rcParams it set at import (per worker)
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import font_manager
+    logging.getLogger("matplotlib.font_manager").setLevel(logging.ERROR)
+    # build / load the font list and resolve every family the charts ask for, once
+    for family in WARM_FONTS:
+        font_manager.findfont(font_manager.FontProperties(family=[family]))
+
+
+def _load(module_name):
+    """Import a chart module, capturing (then undoing) the rcParams it sets at import."""
+    import matplotlib.pyplot as plt
+    if module_name not in _STYLES:
+        with plt.rc_context():
+            module = importlib.import_module(module_name)
+            _STYLES[module_name] = dict(plt.rcParams)
+    return sys.modules[module_name], _STYLES[module_name]
+
+
+def _inputs(job, module, func):
+    """Input files of `job` that its chart function actually reaches."""
+    readers = GENERATORS.get(job.module, ("", {}))[1]
+    names = dependencies(func)[3]
+    return [getattr(module, attr) for attr, via in readers.items() if names & set(via)]
+
+
+def _run_job(job, entry=None, use_cache=True):
+    import matplotlib.pyplot as plt
+    start = time.perf_counter()
+    status, error, key, written = "ok", None, None, []
+    try:
+        module, style = _load(job.module)
+        func = getattr(module, job.func)
+        check = REQUIRES.get(f"{job.module}:{job.func}")
+        if use_cache:
+            key = chart_key(func, _inputs(job, module, func), style, job.args, job.kwargs,
+                            job.depends)
+        if check and not check(module):
+            status = "skipped"
+        elif entry and entry.get("key") == key and outputs_intact(entry):
+            status = "cached"
+        else:
+            with plt.rc_context(style), capture_outputs() as written:
+                func(*job.args, **job.kwargs)
+    except Exception as e:   # report the failure, keep rendering the other charts
+        status, error = "error", f"{type(e).__name__}: {e}"
+    finally:
+        plt.close("all")
+    return job.label, time.perf_counter() - start, status, error, os.getpid(), key, written
+
+
+# ── scheduler ─────────────────────────────────────────────────────────────────
+def _previous_timings(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {c["chart"]: c["seconds"] for c in json.load(f).get("charts", [])}
+
+
+def render_all(jobs=None, workers=None, report_path=REPORT_PATH, verbose=True, force=False,
+               manifest_path=MANIFEST_PATH):
+    """
+    Render `jobs` (default: every discovered chart) on `workers` processes
+    (default: one per core) and return the timing report. Charts unchanged
+    since their last build are skipped unless `force`.
+    """
+    jobs = discover() if jobs is None else list(jobs)
+    manifest = BuildManifest(manifest_path) if manifest_path else None
+    entry = (lambda job: None) if force or manifest is None else (lambda job: manifest.entry(job.label))
+    use_cache = manifest is not None
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    previous = _previous_timings(report_path) if report_path else {}
+    # longest first, so a slow dpi=300 chart does not start last and set the wall time
+    jobs.sort(key=lambda j: previous.get(j.label, float("inf")), reverse=True)
+
+    results = []
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker()
+        results = [_run_job(job, entry(job), use_cache) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_run_job, job, entry(job), use_cache) for job in jobs]
+            results = [f.result() for f in as_completed(futures)]
+    wall = time.perf_counter() - start
+
+    if manifest is not None:
+        for label, _, status, _, _, key, written in results:
+            manifest.record(label, status, key, written)
+    statuses = [r[2] for r in results]
+    hits, misses = statuses.count("cached"), statuses.count("ok")
+    if manifest is not None:
+        manifest.save(hits, misses)
+
+    charts = sorted(({"chart": label, "seconds": round(sec, 3), "status": status,
+                      "error": error, "pid": pid}
+                     for label, sec, status, error, pid, _, _ in results),
+                    key=lambda c: -c["seconds"])
+    busy = sum(c["seconds"] for c in charts)
+    report = {"workers": workers, "wall_s": round(wall, 3), "chart_s": round(busy, 3),
+              "concurrency": round(busy / wall, 2) if wall else None,
+              "cached": hits, "rendered": misses, "charts": charts}
+    if report_path:
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if verbose:
+        print_report(report)
+    return report
+
+
+def print_report(report):
+    print(f"\n{'chart':<58} {'seconds':>8}  status")
+    for c in report["charts"]:
+        line = f"{c['chart']:<58} {c['seconds']:>8.2f}  {c['status']}"
+        print(line + (f"  ({c['error']})" if c["error"] else ""))
+    print(f"\n{len(report['charts'])} chart(s) on {report['workers']} worker(s), "
+          f"{report['rendered']} rendered / {report['cached']} cached: "
+          f"{report['wall_s']:.2f}s wall, {report['chart_s']:.2f}s of chart time "
+          f"(avg {report['concurrency']} in flight)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every chart on a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: cores)")
+    parser.add_argument("--only", default=None,
+                        help="comma-separated generator modules, e.g. survey_charts,generate_charts")
+    parser.add_argument("--list", action="store_true", help="list discovered charts and exit")
+    parser.add_argument("--force", action="store_true", help="re-render even unchanged charts")
+    args = parser.parse_args()
+
+    jobs = discover(args.only.split(",") if args.only else None)
+    if args.list:
+        for job in jobs:
+            print(job.label)
+        sys.exit(0)
+    report = render_all(jobs, workers=args.workers, force=args.force)
+    if any(c["status"] == "error" for c in report["charts"]):
+        sys.exit(1)
@@ -13,11 +13,17 @@ Charts produced:
   6. survey_incentive_preference.png   — Campaign incentive preference
   7. survey_word_association.png       — HashKey brand word cloud / bar
 
+Importing the module does no I/O: load_survey() reads the CSV on first use
+and caches it, and every chart accepts an explicit DataFrame (and output
+directory), so charts can be rendered from a server, a test harness or an
+alternate dataset without touching data/raw.
+
 Run:
     python src/visualization/survey_charts.py
 """
 
 import os
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -32,7 +38,6 @@ warnings.filterwarnings("ignore")
 BASE   = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
 DATA   = os.path.join(BASE, "data", "raw", "survey_raw_responses.csv")
 OUTDIR = os.path.join(BASE, "outputs")
-os.makedirs(OUTDIR, exist_ok=True)
 
 # ── brand palette ─────────────────────────────────────────────────────────────
 HK_BLUE     = "#003087"   # HashKey institutional
@@ -56,13 +61,33 @@ plt.rcParams.update({
     "ytick.labelsize":  9,
 })
 
-df = pd.read_csv(DATA)
-N  = len(df)
+# ── data loading ──────────────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def _read_survey(path):
+    return pd.read_csv(path)
+
+
+def load_survey(path=DATA):
+    """Survey responses from `path`, read on first use and cached per path."""
+    return _read_survey(os.path.abspath(path))
+
+
+def clear_cache():
+    """Forget cached datasets (e.g. after the CSV was regenerated)."""
+    _read_survey.cache_clear()
+
+
+def _output(name, outdir=None):
+    outdir = outdir or OUTDIR
+    os.makedirs(outdir, exist_ok=True)
+    return os.path.join(outdir, name)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 1 — Platform Usage
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_platform_usage():
+def chart_platform_usage(df=None, outdir=None):
+    df = load_survey() if df is None else df
+    N  = len(df)
     counts = df["platform_usage"].value_counts()
     labels = [l.replace(" (", "\n(") for l in counts.index]
     colors = [DEGEN_RED, HK_BLUE, GOLD, GREY_MID]
@@ -86,15 +111,17 @@ def chart_platform_usage():
                 arrowprops=dict(arrowstyle="->", color=DEGEN_RED, lw=1.2))
 
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_platform_usage.png")
+    path = _output("survey_platform_usage.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 2 — Trust Paradox (KEY FINDING)
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_trust_paradox():
+def chart_trust_paradox(df=None, outdir=None):
+    df = load_survey() if df is None else df
     trust_mean  = df["trust_score"].mean()
     engage_mean = df["engagement_score"].mean()
     gap         = trust_mean - engage_mean
@@ -146,15 +173,17 @@ def chart_trust_paradox():
     fig.suptitle("The Trust Paradox — Quantified", fontsize=14,
                  fontweight="bold", color=GREY_DARK, y=1.02)
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_trust_paradox.png")
+    path = _output("survey_trust_paradox.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 3 — Exchange Factor Ranking
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_factor_ranking():
+def chart_factor_ranking(df=None, outdir=None):
+    df = load_survey() if df is None else df
     factors = {
         "User Experience\n(App UI/Speed)":    df["factor_user_experience"].mean(),
         "Fee Structure\n& Incentives":         df["factor_fee_structure"].mean(),
@@ -185,15 +214,18 @@ def chart_factor_ranking():
     ]
     ax.legend(handles=legend_patches, fontsize=8.5, loc="lower right", framealpha=0.6)
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_factor_ranking.png")
+    path = _output("survey_factor_ranking.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 4 — Friction Points
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_friction_points():
+def chart_friction_points(df=None, outdir=None):
+    df = load_survey() if df is None else df
+    N  = len(df)
     counts = df["friction_point"].value_counts()
     colors = [DEGEN_RED if 'Degen' in l else GREY_MID for l in counts.index]
 
@@ -218,15 +250,18 @@ def chart_friction_points():
                 fontsize=8.5, color=DEGEN_RED,
                 arrowprops=dict(arrowstyle="->", color=DEGEN_RED, lw=1.2))
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_friction_points.png")
+    path = _output("survey_friction_points.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 5 — Pizza Day Awareness
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_pizza_day():
+def chart_pizza_day(df=None, outdir=None):
+    df = load_survey() if df is None else df
+    N  = len(df)
     counts = df["pizza_day_awareness"].value_counts()
     order  = ["Yes, I celebrate it", "Heard of it", "No"]
     counts = counts.reindex(order)
@@ -271,15 +306,18 @@ def chart_pizza_day():
     ax2.grid(axis="y", linestyle="--", alpha=0.4, zorder=0)
 
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_pizza_day_awareness.png")
+    path = _output("survey_pizza_day_awareness.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 6 — Incentive Preference
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_incentive():
+def chart_incentive(df=None, outdir=None):
+    df = load_survey() if df is None else df
+    N  = len(df)
     counts = df["incentive_preference"].value_counts()
     short  = {
         "Exclusive Airdrop of Trending Tokens": "Token\nAirdrop",
@@ -305,15 +343,17 @@ def chart_incentive():
                 f"{pct:.1f}%", ha="center", fontsize=10, fontweight="bold",
                 color=GREY_DARK)
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_incentive_preference.png")
+    path = _output("survey_incentive_preference.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Chart 7 — HashKey Word Association
 # ─────────────────────────────────────────────────────────────────────────────
-def chart_word_association():
+def chart_word_association(df=None, outdir=None):
+    df = load_survey() if df is None else df
     word_cols = {
         "Reliable":     "word_reliable",
         "Safe":         "word_safe",
@@ -360,21 +400,21 @@ def chart_word_association():
                 fontsize=8, color=GREY_DARK,
                 arrowprops=dict(arrowstyle="->", color=GREY_DARK, lw=1))
     fig.tight_layout()
-    path = os.path.join(OUTDIR, "survey_word_association.png")
+    path = _output("survey_word_association.png", outdir)
     fig.savefig(path, dpi=150, bbox_inches="tight")
     plt.close(fig)
     print(f"  OK {os.path.basename(path)}")
+    return path
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Run all
 # ─────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from visualization.render import discover, render_all
+
     print("[survey_charts] Generating 7 charts...\n")
-    chart_platform_usage()
-    chart_trust_paradox()
-    chart_factor_ranking()
-    chart_friction_points()
-    chart_pizza_day()
-    chart_incentive()
-    chart_word_association()
+    # rendered in parallel; charts whose data columns and code are unchanged are reused
+    render_all(discover(["survey_charts"]))
     print(f"\n[survey_charts] All charts saved to → {OUTDIR}")
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The pipeline imports its packages from src/ (analysis.*, collectors.*) and the
+# simulation scripts import their siblings directly (from evaluator import ...)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, 'src'), os.path.join(ROOT, 'src', 'simulation')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,162 @@
+import json
+
+import pandas as pd
+import pytest
+
+from analysis.anomaly import AnomalyMonitor
+from analysis.incremental import ProcessedIndex
+from analysis.processor import DataProcessor
+from analysis.sentiment import SentimentEngine, score_text
+from analysis.tokenizer import Tokenizer
+
+HEADER = "id,timestamp,platform,user,content\n"
+
+
+def raw_row(i, day=1):
+    return f"raw_{i:04d},2025-05-{day:02d} 10:00:00,Twitter,user_{i},HashKey post number {i} is great\n"
+
+
+# ── memo / cache eviction ────────────────────────────────────────────────────
+def test_sentiment_memo_eviction_keeps_hits_of_the_same_call():
+    engine = SentimentEngine(workers=1, max_memo=3)
+    first = ['great exchange', 'terrible fees', 'ok']
+    engine.score(first)
+    # one memo hit plus enough new texts to overflow the memo in the same call
+    texts = ['great exchange', 'slow withdrawal', 'love the UI', 'great exchange']
+    scores = engine.score(texts)
+
+    assert list(scores) == [round(score_text(t), 4) for t in texts]
+    assert len(engine._memo) <= 3
+
+
+def test_sentiment_memo_stays_bounded():
+    engine = SentimentEngine(workers=1, max_memo=5)
+    for i in range(10):
+        engine.score([f"post {i} {j}" for j in range(3)])
+        assert len(engine._memo) <= 5
+
+
+def test_tokenizer_cache_eviction_keeps_hits_of_the_same_call():
+    tokenizer = Tokenizer(stopwords=set(), workers=1, max_cache=2)
+    tokenizer.tokenize(['HashKey 好正', 'KYC slow'])
+    texts = ['HashKey 好正', 'new listing today', 'fees too high', 'HashKey 好正']
+    tokens = tokenizer.tokenize(texts)
+
+    assert tokens == Tokenizer(stopwords=set(), workers=1).tokenize(texts)
+    assert len(tokenizer._cache) <= 2
+
+
+# ── processed-ID index and partial trailing rows ─────────────────────────────
+@pytest.fixture
+def archive(tmp_path):
+    path = tmp_path / 'raw.csv'
+    # three complete rows and a fourth still being written
+    path.write_text(HEADER + raw_row(1) + raw_row(2) + raw_row(3) + "raw_0004,2025-05-01 10:0",
+                    encoding='utf-8')
+    return path
+
+
+def make_processor(archive, tmp_path):
+    return DataProcessor(str(archive), str(tmp_path / 'processed'), workers=1, storage='csv')
+
+
+def finish_partial_row(archive):
+    with open(archive, 'a', encoding='utf-8') as f:
+        f.write("0:00,Twitter,user_4,HashKey post number 4 is great\n" + raw_row(5))
+
+
+def test_incremental_run_leaves_partial_row_for_next_run(archive, tmp_path):
+    processor = make_processor(archive, tmp_path)
+    rows, _ = processor.process_incremental()
+    assert rows == 3
+    index = ProcessedIndex(str(tmp_path / 'processed'))
+    assert index.ids == {'raw_0001', 'raw_0002', 'raw_0003'}
+    assert index.state['offset'] == len((HEADER + raw_row(1) + raw_row(2) + raw_row(3)).encode())
+
+    finish_partial_row(archive)
+    assert ProcessedIndex(str(tmp_path / 'processed')).resume_offset(str(archive)) == index.state['offset']
+    rows, _ = processor.process_incremental()
+    processor.close()
+
+    assert rows == 2
+    results = processor.load_results()
+    assert sorted(results['id']) == [f"raw_{i:04d}" for i in range(1, 6)]
+    assert results.loc[results['id'] == 'raw_0004', 'timestamp'].astype(str).iloc[0] == '2025-05-01 10:00:00'
+
+
+def test_streaming_rebuild_stops_at_last_complete_row(archive, tmp_path):
+    processor = make_processor(archive, tmp_path)
+    rows, _ = processor.process_sentiment_streaming(chunksize=2)
+    assert rows == 3
+
+    finish_partial_row(archive)
+    rows, _ = processor.process_incremental()
+    processor.close()
+    assert rows == 2
+    assert processor.load_results()['id'].is_unique
+
+
+def test_processed_index_skips_repeated_ids(tmp_path):
+    index = ProcessedIndex(str(tmp_path))
+    index.add(['a', 'b', 'a'])
+    index.add(['b', 'c'])
+    assert (tmp_path / 'processed_ids.txt').read_text().split() == ['a', 'b', 'c']
+
+
+# ── anomaly monitor ordering ─────────────────────────────────────────────────
+def feed(day, n=5, score=0.1, platform='Twitter'):
+    start = pd.Timestamp(f"2025-05-{day:02d} 12:00")
+    return pd.DataFrame({'timestamp': pd.date_range(start, periods=n, freq='min'),
+                         'platform': platform, 'analyzed_sentiment': score})
+
+
+def test_monitor_accepts_rows_within_the_reorder_window():
+    monitor = AnomalyMonitor(freq='D', reorder=2)
+    for day in (3, 1, 2, 5, 4):
+        monitor.observe(feed(day))
+    assert monitor.late_rows == 0
+    assert monitor.closed['Twitter'] == pd.Timestamp('2025-05-02')
+    assert sorted(monitor.open['Twitter']) == [pd.Timestamp(f"2025-05-0{d}") for d in (3, 4, 5)]
+
+
+def test_monitor_counts_rows_behind_the_window_as_late():
+    monitor = AnomalyMonitor(freq='D', reorder=1)
+    monitor.observe(feed(5))
+    monitor.observe(feed(2, n=4))
+    assert monitor.late_rows == 8   # per platform and for all platforms combined
+
+
+def test_monitor_scores_unordered_chunks_like_ordered_ones():
+    days = list(range(1, 21))
+    frames = {d: feed(d, score=-0.9 if d == 15 else 0.1 + 0.01 * (d % 3)) for d in days}
+
+    ordered = AnomalyMonitor(freq='D')
+    events = sum((ordered.observe(frames[d]) for d in days), []) + ordered.flush()
+    shuffled = AnomalyMonitor(freq='D')
+    swapped = days[:]
+    for i in range(0, len(swapped) - 1, 2):
+        swapped[i], swapped[i + 1] = swapped[i + 1], swapped[i]
+    unordered = sum((shuffled.observe(frames[d]) for d in swapped), []) + shuffled.flush()
+
+    assert events and events == unordered
+    assert shuffled.late_rows == 0
+
+
+def test_monitor_state_round_trips_and_loads_the_old_format(tmp_path):
+    monitor = AnomalyMonitor(freq='D')
+    for day in (1, 2, 3, 4):
+        monitor.observe(feed(day))
+    path = str(tmp_path / 'anomaly_state.json')
+    monitor.save(path)
+    restored = AnomalyMonitor.load(path)
+    assert restored.open == monitor.open and restored.closed == monitor.closed
+
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    state['open'] = {'Twitter': ['2025-05-04 00:00:00', 5, 0.5]}   # one open bucket, no 'closed'
+    del state['closed'], state['params']['reorder']
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    legacy = AnomalyMonitor.load(path)
+    assert legacy.open == {'Twitter': {pd.Timestamp('2025-05-04'): [5, 0.5]}}
+    assert legacy.reorder == 2
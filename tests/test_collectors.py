@@ -0,0 +1,159 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from analysis.processor import DataProcessor
+from collectors import base
+from collectors.adapters import PlatformAdapter
+from collectors.base import Collector
+
+
+class FakeSocialServer(ThreadingHTTPServer):
+    """Twitter v2 recent search and a Telegram bridge, backed by in-memory posts."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SocialHandler)
+        self.tweets = []          # newest first, like the search API
+        self.messages = []        # oldest first, like the bridge
+        self.requests = []
+        self.fail_next = 0        # answer this many requests with 429
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def add_tweets(self, n):
+        start = int(self.tweets[0]['id']) + 1 if self.tweets else 1000
+        for i in range(start, start + n):
+            self.tweets.insert(0, {'id': str(i), 'text': f"HashKey tweet {i}", 'author_id': '7',
+                                   'created_at': f"2025-05-{1 + i % 28:02d}T08:00:00Z"})
+
+
+class _SocialHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, obj, status=200):
+        data = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server.requests.append((url.path, query))
+        if server.fail_next:
+            server.fail_next -= 1
+            return self._send({'title': 'Too Many Requests'}, 429)
+
+        if url.path == '/2/tweets/search/recent':
+            since = query.get('since_id')
+            items = [t for t in server.tweets if not since or int(t['id']) > int(since)]
+            start, size = int(query.get('next_token', 0)), int(query['max_results'])
+            meta = {'result_count': len(items[start:start + size])}
+            if items:
+                meta['newest_id'] = items[0]['id']
+            if start + size < len(items):
+                meta['next_token'] = str(start + size)
+            return self._send({'data': items[start:start + size], 'meta': meta,
+                               'includes': {'users': [{'id': '7', 'username': 'hk_trader'}]}})
+        if url.path.startswith('/channels/'):
+            after, limit = int(query['after_id']), int(query['limit'])
+            return self._send({'messages': [m for m in server.messages if m['id'] > after][:limit]})
+        self._send({'error': 'not found'}, 404)
+
+
+@pytest.fixture
+def server():
+    srv = FakeSocialServer()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def make_config(server, queries=('#HashKey',), groups=()):
+    return {
+        'twitter': {'bearer_token': 'token', 'base_url': server.url, 'queries': list(queries),
+                    'rate_per_s': 200, 'burst': 10},
+        'telegram': {'base_url': server.url, 'groups': list(groups), 'rate_per_s': 200, 'burst': 10},
+        'lihkg': {'threads': []},
+        'collection': {'page_size': 20, 'max_pages': 50},
+    }
+
+
+def test_platform_adapter_requires_pages():
+    with pytest.raises(TypeError):
+        PlatformAdapter({})
+
+
+def test_twitter_pages_through_results_and_resumes_from_cursor(server, tmp_path):
+    server.add_tweets(55)
+    cursors = str(tmp_path / 'cursors.json')
+
+    rows = Collector(make_config(server), cursor_path=cursors).run()
+    assert len(rows) == 55 and rows['id'].is_unique
+    assert set(rows['platform']) == {'Twitter'} and set(rows['user']) == {'hk_trader'}
+    assert sum(path.endswith('/recent') for path, _ in server.requests) == 3   # 20 + 20 + 15
+    with open(cursors, encoding='utf-8') as f:
+        assert f.read().count(server.tweets[0]['id']) == 1   # since_id = newest tweet
+
+    server.add_tweets(4)
+    server.requests.clear()
+    rows = Collector(make_config(server), cursor_path=cursors).run()
+    assert sorted(rows['id']) == sorted(f"tw_{t['id']}" for t in server.tweets[:4])
+    assert server.requests[0][1]['since_id'] == server.tweets[4]['id']
+
+
+def test_telegram_resumes_after_last_message(server, tmp_path):
+    server.messages = [{'id': i, 'date': 1716336000 + i, 'sender': 's', 'text': f"msg {i}"}
+                       for i in range(1, 31)]
+    cursors = str(tmp_path / 'cursors.json')
+    config = make_config(server, queries=(), groups=('hk_group',))
+    config['twitter']['bearer_token'] = 'YOUR_BEARER_TOKEN'   # placeholder → Twitter disabled
+
+    assert len(Collector(config, cursor_path=cursors).run()) == 30
+    server.messages.append({'id': 31, 'date': 1716336031, 'sender': 's', 'text': "msg 31"})
+    rows = Collector(config, cursor_path=cursors).run()
+    assert list(rows['id']) == ['tg_hk_group_31']
+
+
+def test_rate_limited_request_is_retried(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(base, 'RETRY_BACKOFF_S', 0.0)
+    server.add_tweets(5)
+    server.fail_next = 1
+    collector = Collector(make_config(server), cursor_path=str(tmp_path / 'cursors.json'))
+    assert len(collector.run()) == 5
+    assert collector.stats['retries'] == 1 and collector.stats['errors'] == 0
+
+
+def test_overlapping_sources_are_archived_and_scored_once(server, tmp_path):
+    server.add_tweets(30)
+    archive = str(tmp_path / 'raw.csv')
+    processor = DataProcessor(archive, str(tmp_path / 'processed'), workers=1, storage='csv')
+    collector = Collector(make_config(server, queries=('#HashKey', '#HKWeb3')),
+                          cursor_path=str(tmp_path / 'cursors.json'))
+    try:
+        collector.run(processor=processor, archive_path=archive)
+        again = collector.run(processor=processor, archive_path=archive)   # nothing new
+    finally:
+        processor.close()
+
+    archived = pd.read_csv(archive, dtype={'id': str})
+    assert len(archived) == 30 and archived['id'].is_unique
+    assert len(processor.load_results()) == 30
+    assert again.empty
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from collectors.mock_generator import generate_mock_data
+from main import PipelineRun, _backfill_window
+
+
+def test_mock_ids_have_one_width_across_chunks(tmp_path):
+    path = generate_mock_data(rows=10_005, chunksize=3_000, output_path=str(tmp_path / 'feed.csv'))
+    ids = pd.read_csv(path, dtype={'id': str})['id']
+    assert ids.str.len().nunique() == 1
+    assert ids.is_monotonic_increasing and ids.iloc[-1] == 'raw_10004'
+
+
+def test_backfill_end_date_covers_the_whole_day():
+    start, end = _backfill_window('2025-05-20', '2025-05-23')
+    assert start == datetime(2025, 5, 20)
+    assert datetime(2025, 5, 23, 23, 59, 59) <= end < datetime(2025, 5, 24)
+    assert _backfill_window('2025-05-20', '2025-05-23 12:00')[1] == datetime(2025, 5, 23, 12)
+    with pytest.raises(ValueError):
+        _backfill_window('2025-05-24', '2025-05-23')
+
+
+def test_reset_monitor_starts_from_empty_history():
+    run = PipelineRun()
+    monitor = run.reset_monitor()
+    assert run.monitor is monitor and not monitor.series
@@ -0,0 +1,265 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+import campaign_sim as cs
+from evaluator import TokenBucket, evaluate_concurrently
+from journal import RunJournal, run_fingerprint
+from local_backend import parametric_reaction
+from metrics import PhaseTimer, build_metrics
+
+USAGE = {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+AGENT = next(iter(cs.AGENT_TYPES))
+
+
+def valid_reply(agent_type=AGENT):
+    return json.dumps(parametric_reaction(cs.AGENT_TYPES[agent_type], cs.SCENARIOS['base'], cs.STIMULI[0]))
+
+
+class ChatStub(ThreadingHTTPServer):
+    """
+    OpenAI-compatible /chat/completions endpoint. `reply(body, n)` returns the
+    assistant text for the n-th request (default: a valid reaction); streamed
+    requests get it in small deltas followed by trailing tokens and, when
+    asked for, a final usage chunk.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        super().__init__(('127.0.0.1', 0), _ChatHandler)
+        self.delay = delay
+        self.reply = lambda body, n: valid_reply()
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests.append(body)
+            n = len(server.requests)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            text = server.reply(body, n)
+            if body.get('stream'):
+                self._stream(body, text)
+            else:
+                self._send({'id': 'stub', 'object': 'chat.completion', 'created': 0,
+                            'model': body['model'], 'usage': USAGE,
+                            'choices': [{'index': 0, 'finish_reason': 'stop',
+                                         'message': {'role': 'assistant', 'content': text}}]})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body, text):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        chunk = {'id': 'stub', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model']}
+        for piece in [text[i:i + 16] for i in range(0, len(text), 16)] + [' (trailing tokens)']:
+            delta = dict(chunk, choices=[{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}])
+            self.wfile.write(f"data: {json.dumps(delta)}\n\n".encode())
+        if (body.get('stream_options') or {}).get('include_usage'):
+            self.wfile.write(f"data: {json.dumps(dict(chunk, choices=[], usage=USAGE))}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+@pytest.fixture
+def stub():
+    server = ChatStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub):
+    return OpenAI(api_key='test', base_url=stub.url, max_retries=0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(cs, 'RETRY_BACKOFF_S', 0.0)
+    cs.CALL_STATS.reset()
+    yield
+    cs.CALL_STATS.reset()
+
+
+# ── thread pool + token bucket ───────────────────────────────────────────────
+def test_token_bucket_limits_sustained_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.perf_counter() - start >= 5 / 20 * 0.9
+
+
+def test_evaluate_concurrently_overlaps_calls_and_keeps_job_order(stub, client):
+    stub.delay = 0.2
+    jobs = {f"job{i}": (i,) for i in range(8)}
+
+    def evaluate(i):
+        return cs._request_json(client, f"prompt {i}", 50, 'per_type')
+
+    start = time.perf_counter()
+    results = evaluate_concurrently(jobs, evaluate, max_workers=4, rate=100, burst=4)
+    elapsed = time.perf_counter() - start
+
+    assert list(results) == list(jobs)
+    assert all(r is not None and 'stance_change' in r for r in results.values())
+    assert 2 <= stub.max_in_flight <= 4
+    assert elapsed < 8 * 0.2   # faster than one call at a time
+    stats = cs.CALL_STATS.summary()['per_type']
+    assert stats['calls'] == 8
+    assert stats['prompt_tokens'] == 8 * USAGE['prompt_tokens']
+
+
+def test_evaluate_concurrently_admits_calls_at_the_bucket_rate(stub, client):
+    jobs = {i: (i,) for i in range(5)}
+    start = time.perf_counter()
+    evaluate_concurrently(jobs, lambda i: cs._request_json(client, str(i), 50, 'per_type'),
+                          max_workers=5, rate=10, burst=1)
+    assert time.perf_counter() - start >= 4 / 10 * 0.9
+    assert len(stub.requests) == 5
+
+
+def test_evaluate_concurrently_turns_exceptions_into_none():
+    def evaluate(i):
+        if i == 1:
+            raise RuntimeError("boom")
+        return i * 10
+
+    assert evaluate_concurrently({'a': (0,), 'b': (1,), 'c': (2,)}, evaluate, rate=100) \
+        == {'a': 0, 'b': None, 'c': 20}
+
+
+# ── retries and fallbacks on malformed replies ───────────────────────────────
+@pytest.mark.parametrize('bad', ['not json at all', '{"stance_change": "high"', '{"stance_change": 0.1}'])
+def test_invalid_reply_is_retried(stub, client, bad):
+    stub.reply = lambda body, n: bad if n == 1 else valid_reply()
+    reaction = cs.evaluate_agent_reaction(client, AGENT, cs.AGENT_TYPES[AGENT],
+                                          cs.SCENARIOS['base'], cs.STIMULI[0])
+    assert reaction is not None
+    stats = cs.CALL_STATS.summary()['per_type']
+    assert (stats['calls'], stats['retries'], stats['invalid'], stats['failed']) == (2, 1, 1, 0)
+
+
+def test_exhausted_retries_fall_back_to_none(stub, client):
+    stub.reply = lambda body, n: 'still not json'
+    reaction = cs.evaluate_agent_reaction(client, AGENT, cs.AGENT_TYPES[AGENT],
+                                          cs.SCENARIOS['base'], cs.STIMULI[0])
+    assert reaction is None
+    stats = cs.CALL_STATS.summary()['per_type']
+    assert stats['calls'] == cs.MAX_RETRIES + 1
+    assert stats['failed'] == 1
+
+
+def test_batched_reply_missing_a_type_falls_back_per_type(stub, client):
+    def reply(body, n):
+        prompt = body['messages'][0]['content']
+        names = re.search(r"agent type above \(([^)]*)\)", prompt)
+        if names is None:
+            return valid_reply()
+        first = names.group(1).split(', ')[0]
+        return json.dumps([dict(json.loads(valid_reply(first)), agent_type=first)])
+
+    stub.reply = reply
+    reactions = cs.fetch_reactions(cs.DeepSeekBackend(client), {'base': cs.SCENARIOS['base']},
+                                   max_workers=4, rate=1000, batched=True)
+
+    resolved = [r for rnd in reactions['base'].values() for r in rnd.values()]
+    assert len(resolved) == len(cs.STIMULI) * len(cs.AGENT_TYPES)
+    assert all(r is not None for r in resolved)
+    summary = cs.CALL_STATS.summary()
+    assert summary['batched']['calls'] == len(cs.STIMULI)
+    assert summary['per_type']['calls'] == len(cs.STIMULI) * (len(cs.AGENT_TYPES) - 1)
+
+
+# ── usage accounting ─────────────────────────────────────────────────────────
+def test_stream_closed_early_records_usage_as_unknown(stub, client):
+    reaction = cs._request_json(client, 'prompt', 50, 'per_type', stream=True)
+
+    assert 'stance_change' in reaction
+    assert stub.requests[0]['stream_options'] == {'include_usage': True}
+    stats = cs.CALL_STATS.summary()['per_type']
+    assert stats['prompt_tokens'] is None and stats['usage_unknown'] == 1
+    metrics = build_metrics(cs.CALL_STATS, PhaseTimer(), {'api': 1})
+    assert metrics['api']['est_cost_usd'] is None
+
+
+def test_batch_benchmark_refuses_stream(capsys):
+    with pytest.raises(SystemExit):
+        cs.main(['--backend', 'local', '--batch-benchmark', '--stream'])
+    assert '--stream' in capsys.readouterr().out
+
+
+# ── journal resume ───────────────────────────────────────────────────────────
+def _local_reactions():
+    return cs.fetch_reactions(cs.LocalBackend(), {'base': cs.SCENARIOS['base']})['base']
+
+
+def test_journal_resume_matches_uninterrupted_run(tmp_path):
+    reactions = _local_reactions()
+    fingerprint = run_fingerprint(seed=cs.RANDOM_SEED, scenario='base')
+    full = cs.run_scenario('base', cs.SCENARIOS['base'], reactions,
+                           journal=RunJournal(str(tmp_path / 'full'), fingerprint))
+
+    # crash after round 1: keep the journal up to its first round record, plus a torn line
+    lines = (tmp_path / 'full' / 'journal.jsonl').read_text(encoding='utf-8').splitlines(keepends=True)
+    first_round = next(i for i, line in enumerate(lines) if json.loads(line)['kind'] == 'round')
+    crashed = tmp_path / 'crashed'
+    (crashed / 'state').mkdir(parents=True)
+    (crashed / 'journal.jsonl').write_text(''.join(lines[:first_round + 1]) + '{"kind": "rou',
+                                           encoding='utf-8')
+    state = json.loads(lines[first_round])['state']
+    (crashed / 'state' / state).write_bytes((tmp_path / 'full' / 'state' / state).read_bytes())
+
+    journal = RunJournal(str(crashed), fingerprint)
+    assert journal.rounds['base']['round'] == 1
+    resumed = cs.run_scenario('base', cs.SCENARIOS['base'], reactions, journal=journal)
+
+    assert resumed['predicted_metrics'] == full['predicted_metrics']
+    assert [r['agent_snapshot'] for r in resumed['round_logs']] \
+        == [r['agent_snapshot'] for r in full['round_logs']]
+
+
+def test_journal_with_other_fingerprint_is_discarded(tmp_path):
+    journal = RunJournal(str(tmp_path), run_fingerprint(seed=1))
+    journal.record_reaction('base', 1, AGENT, {'stance_change': 0.1})
+    assert RunJournal(str(tmp_path), run_fingerprint(seed=1)).resumable
+    assert not RunJournal(str(tmp_path), run_fingerprint(seed=2)).resumable
+
+
+def test_local_backend_writes_outside_committed_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(cs, 'OUTPUT_DIR', str(tmp_path))
+    assert cs.parse_args(['--backend', 'local']).out_dir == str(tmp_path / 'local')
+    assert cs.parse_args([]).out_dir == str(tmp_path)